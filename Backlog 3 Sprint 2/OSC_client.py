@@ -1,6 +1,7 @@
 import time
+import socket
 import RPi.GPIO as GPIO
-from pythonosc import udp_client
+from osc_codec import OscEncoder  # from Final/: run with PYTHONPATH=Final (see README)
 
 SENSOR_MAP = {
     1: 22,
@@ -14,7 +15,17 @@ SENSOR_MAP = {
 SERVER_IP   = "192.168.254.108"
 SERVER_PORT = 8001
 
-osc_client = udp_client.SimpleUDPClient(SERVER_IP, SERVER_PORT)
+# Presses are encoded straight into one reused buffer (osc_codec.py) and sent
+# from a plain UDP socket; the argument list for each sensor is made once here.
+# Each press also carries a press ID, counted from 1 each time this script
+# starts. The game's latency trace (latency_trace.py) keeps it, with this
+# Pi's address, next to its own trace ID, so a press can be matched up on
+# both Pis:
+#     /print "Sensor 3 Pressed" 17
+sock    = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+encoder = OscEncoder()
+PRESS_ARGS = {s: [f"Sensor {s} Pressed", 0] for s in SENSOR_MAP}
+press_id = 0
 
 GPIO.setmode(GPIO.BCM)
 for pin in SENSOR_MAP.values():
@@ -29,8 +40,11 @@ try:
             if pressed != sensor_states[sensor_num]:
                 sensor_states[sensor_num] = pressed
                 if pressed:
+                    press_id = (press_id + 1) & 0x7FFFFFFF
                     print(f"Sensor {sensor_num} Pressed")
-                    osc_client.send_message("/print", [f"Sensor {sensor_num} Pressed"])
+                    args = PRESS_ARGS[sensor_num]
+                    args[1] = press_id
+                    sock.sendto(encoder.encode("/print", args), (SERVER_IP, SERVER_PORT))
         time.sleep(0.1)
 
 except KeyboardInterrupt:
@@ -1,9 +1,9 @@
-from pythonosc import udp_client
 import time
+import osc_pool  # from Final/: run with PYTHONPATH=Final (see README)
 
 def send_message(receiver_ip, receiver_port, address, message):
 	try:
-		client = udp_client.SimpleUDPClient(receiver_ip, receiver_port)
+		client = osc_pool.client(receiver_ip, receiver_port)
 		client.send_message(address, message)
 		print(f"Sent to {address} with msg {message}")
 	except Exception as e:
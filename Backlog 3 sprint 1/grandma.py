@@ -1,10 +1,11 @@
-from pythonosc import udp_client, osc_message_builder
+from pythonosc import osc_message_builder
 import time
+import osc_pool  # from Final/: run with PYTHONPATH=Final (see README)
 
 def send_message(receiver_ip, receiver_port, address, message):
 	try:
-		# Create an OSC client to send messages
-		client = udp_client.SimpleUDPClient(receiver_ip, receiver_port)
+		# Shared OSC client (one socket) for this destination
+		client = osc_pool.client(receiver_ip, receiver_port)
 
 		# Send an OSC message to the receiver
 		client.send_message(address, message)
@@ -18,7 +19,7 @@ if __name__ == "__main__":
     PORT = 8000                  
     addr = "/gma3/cmd"
 
-client = udp_client.SimpleUDPClient(LAPTOP_IP, PORT)
+client = osc_pool.client(LAPTOP_IP, PORT)
 
 send_message(LAPTOP_IP, PORT, addr, "On Sequence 2")
 print("Sequence 2 on")
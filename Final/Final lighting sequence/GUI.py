@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from pythonosc import udp_client
+import osc_pool  # from Final/: run with PYTHONPATH=Final (see README)
 import threading
 import time
 
@@ -11,8 +11,8 @@ class AVControlGUI:
         self.REAPER_IP, self.REAPER_PORT = "192.168.254.12", 8000
 
         # Set up OSC clients
-        self.gma_client = udp_client.SimpleUDPClient(self.GMA_IP, self.GMA_PORT)
-        self.reaper_client = udp_client.SimpleUDPClient(self.REAPER_IP, self.REAPER_PORT)
+        self.gma_client = osc_pool.client(self.GMA_IP, self.GMA_PORT)
+        self.reaper_client = osc_pool.client(self.REAPER_IP, self.REAPER_PORT)
 
         # Create and configure main window
         self.root = tk.Tk()
@@ -0,0 +1,320 @@
+"""
+LED effect benchmark.
+
+Runs every effect from led_effects.py (live and pre-rendered), the
+compiled stage start shows from led_shows.py and the blocking MVP versions
+from MVP/game code.py against the simulated strip (neopixel_sim.py) on a
+virtual clock, so a full run takes seconds.
+
+For each effect it reports, as JSON:
+  - caller_blocked_s  how long the caller is stuck (submit() vs the old blocking call)
+  - duration_s        how long the effect plays on the strip
+  - wall_s            real CPU time spent rendering
+  - shows             strip.show() calls
+  - python_calls      Python + C function calls (sys.setprofile)
+  - frame_ms          CPU time per frame: mean, jitter (std dev), p99, max
+  - effective_fps     frame rate the real strip would reach
+
+    python3 bench_leds.py --leds 300 --out bench.json
+    python3 bench_leds.py --baseline bench.json   # exit 1 on regressions
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import importlib.util
+
+import neopixel_sim
+from neopixel_sim import Adafruit_NeoPixel, Color
+from sim_clock import VirtualClock
+from led_engine import LedEngine
+from led_cache import EffectCache, play
+from led_progress import ProgressBar
+from led_compositor import DEFAULT_LAYERS
+from led_color import ColorPipeline
+import led_effects
+from led_shows import LEVEL_START_SHOWS, compile_show
+from led_segments import MultiStrip
+import led_spatial
+from percentiles import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MVP_GAME = os.path.join(HERE, "..", "MVP", "game code.py")
+
+# Compared against --baseline; wall-clock numbers are too noisy to gate on.
+GATED = ("shows", "python_calls", "duration_s")
+
+
+class TimedStrip(Adafruit_NeoPixel):
+    """Simulated strip that also notes the real time of every show()."""
+
+    def __init__(self, num, clock):
+        super().__init__(num, 18, 800000, 10, False, 128, clock=clock)
+        self.stamps = []
+
+    def show(self):
+        self.stamps.append(time.perf_counter())
+        super().show()
+
+
+class TimedMultiStrip(MultiStrip):
+    """Several TimedStrips driven as one canvas."""
+
+    def __init__(self, strips):
+        super().__init__(strips)
+        self.stamps = []
+
+    def show(self):
+        self.stamps.append(time.perf_counter())
+        super().show()
+
+
+def make_strip(run, leds, clock):
+    """A case can ask for its own canvas size (`run.leds`) split over `run.strips` strips."""
+    leds = getattr(run, "leds", leds)
+    parts = getattr(run, "strips", 1)
+    if parts == 1:
+        return TimedStrip(leds, clock)
+    return TimedMultiStrip([TimedStrip(leds // parts, clock) for _ in range(parts)])
+
+
+# -------- Cases --------
+def final_case(effect, *args, cache=None, color=None):
+    def run(strip, clock, fps):
+        engine = LedEngine(strip, fps=fps, clock=clock, color=color)
+        if cache is not None:
+            frames = play(engine.fb, cache.get(effect, *args))
+        else:
+            frames = effect(engine.fb, *args)
+        t = time.perf_counter()
+        engine.submit(frames)
+        blocked = time.perf_counter() - t
+        engine.run_until_idle()
+        return blocked
+    return run
+
+
+def show_case(seq):
+    """A show compiled from a led_shows.py table."""
+    def run(strip, clock, fps):
+        engine = LedEngine(strip, fps=fps, clock=clock)
+        t = time.perf_counter()
+        engine.submit(play(engine.fb, seq))
+        blocked = time.perf_counter() - t
+        engine.run_until_idle()
+        return blocked
+    return run
+
+
+def progress_case(presses):
+    """One press after another, letting the bar catch up in between."""
+    def run(strip, clock, fps):
+        engine = LedEngine(strip, fps=fps, clock=clock)
+        bar = ProgressBar(engine, Color(255, 0, 0))
+        n = strip.numPixels()
+        blocked = 0.0
+        for count in range(1, presses + 1):
+            t = time.perf_counter()
+            bar.advance(n * count // presses)
+            blocked += time.perf_counter() - t
+            engine.run_until_idle()
+        return blocked
+    return run
+
+
+def layered_case(presses):
+    """The bar keeps growing on its layer while a flash plays on top of it."""
+    def run(strip, clock, fps):
+        engine = LedEngine(strip, fps=fps, clock=clock, layers=DEFAULT_LAYERS)
+        bar = ProgressBar(engine, Color(255, 0, 0))
+        n = strip.numPixels()
+        t = time.perf_counter()
+        engine.submit(led_effects.flash(engine.layer("overlay"), n, Color(0, 255, 0), 1))
+        for count in range(1, presses + 1):
+            bar.advance(n * count // presses)
+        blocked = time.perf_counter() - t
+        engine.run_until_idle()
+        return blocked
+    return run
+
+
+def mvp_progress_case(mvp, presses):
+    """What the MVP does: light_up() from pixel 0 at each of the four milestones."""
+    def run(strip, clock, fps):
+        mvp.strip = strip
+        n = strip.numPixels()
+        t = time.perf_counter()
+        for count in range(presses // 4, presses + 1, presses // 4):
+            mvp.light_up(n * count // presses, Color(255, 0, 0))
+        return time.perf_counter() - t
+    return run
+
+
+def mvp_case(mvp, name, *args):
+    def run(strip, clock, fps):
+        mvp.strip = strip
+        mvp.time = clock  # the MVP effects call time.sleep() directly
+        mvp.LED_COUNT = strip.numPixels()
+        start = clock.t
+        t = time.perf_counter()
+        getattr(mvp, name)(*args)
+        return (clock.t - start) + (time.perf_counter() - t)
+    return run
+
+
+def load_mvp():
+    neopixel_sim.install()
+    spec = importlib.util.spec_from_file_location("mvp_game", MVP_GAME)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_cases(leds, fps):
+    green, red = Color(0, 255, 0), Color(255, 0, 0)
+    cache = EffectCache(leds, fps)
+    live = {
+        "fill_half": (led_effects.fill, leds // 2, red),
+        "flash_green_2s": (led_effects.flash, leds, green, 2),
+        "red_dim": (led_effects.red_dim, leds),
+        "green_dim": (led_effects.green_dim, leds),
+        "flash_bpm": (led_effects.flash_bpm, leds),
+    }
+
+    cases = {}
+    for name, (effect, *args) in live.items():
+        cases[f"final.{name}"] = final_case(effect, *args)
+        if name != "fill_half":
+            cache.get(effect, *args)  # warmed at startup in the game too
+            cases[f"final.{name}[cached]"] = final_case(effect, *args, cache=cache)
+
+    for level in range(1, 5):
+        seq = compile_show(LEVEL_START_SHOWS[level], leds, fps)
+        cases[f"final.level_start_sequence_{level}[show]"] = show_case(seq)
+
+    # 2D effects over the board's pixel map
+    pmap = led_spatial.PixelMap.load(os.path.join(HERE, "pixel_map.json"), leds)
+    for effect in (led_spatial.radial_burst, led_spatial.angle_wipe, led_spatial.glow):
+        cases[f"final.{effect.__name__}[2d]"] = final_case(effect, pmap, Color(255, 255, 255))
+
+    # The same 2x longer canvas on one strip and split over the two DMA
+    # outputs (PWM and PCM) that really do send in parallel.
+    for parts in (1, 2):
+        run = final_case(led_effects.red_dim, leds * 2)
+        run.leds, run.strips = leds * 2, parts
+        cases[f"final.red_dim_{leds * 2}px[{parts}ch]"] = run
+
+    pipeline = ColorPipeline(brightness=128)
+    cases["final.red_dim[gamma]"] = final_case(led_effects.red_dim, leds, color=pipeline)
+    cases["final.progress_bar_160_presses"] = progress_case(160)
+    cases["final.progress_under_flash[layered]"] = layered_case(160)
+
+    try:
+        mvp = load_mvp()
+    except Exception as e:
+        print(f"Skipping MVP effects: {e}", file=sys.stderr)
+        return cases
+    # level_start_sequence is left out: the MVP version also sends OSC to REAPER.
+    cases["mvp.light_up_half"] = mvp_case(mvp, "light_up", leds // 2, red)
+    cases["mvp.progress_4_milestones"] = mvp_progress_case(mvp, 160)
+    cases["mvp.red_dim_down"] = mvp_case(mvp, "red_dim_down", leds)
+    cases["mvp.green_dim_down"] = mvp_case(mvp, "green_dim_down", leds)
+    cases["mvp.flash_bpm"] = mvp_case(mvp, "flash_bpm", leds)
+    return cases
+
+
+# -------- Measuring --------
+def count_calls(run, leds, fps):
+    calls = [0]
+
+    def profiler(frame, event, arg):
+        if event in ("call", "c_call"):
+            calls[0] += 1
+
+    clock = VirtualClock()
+    strip = make_strip(run, leds, clock)
+    sys.setprofile(profiler)
+    try:
+        run(strip, clock, fps)
+    finally:
+        sys.setprofile(None)
+    return calls[0]
+
+
+def measure(run, leds, fps):
+    clock = VirtualClock()
+    strip = make_strip(run, leds, clock)
+    t = time.perf_counter()
+    blocked = run(strip, clock, fps)
+    wall = time.perf_counter() - t
+
+    frame_ms = [(b - a) * 1000 for a, b in zip(strip.stamps, strip.stamps[1:])]
+    report = strip.report()
+    return {
+        "caller_blocked_s": round(blocked, 6),
+        "duration_s": round(clock.t, 4),
+        "wall_s": round(wall, 6),
+        "shows": strip.shows,
+        "python_calls": count_calls(run, leds, fps),
+        "frame_ms": {
+            "mean": round(statistics.mean(frame_ms), 4) if frame_ms else 0.0,
+            "jitter": round(statistics.pstdev(frame_ms), 4) if frame_ms else 0.0,
+            "p99": round(percentile(frame_ms, 99), 4),
+            "max": round(max(frame_ms), 4) if frame_ms else 0.0,
+        },
+        "effective_fps": round(report["effective_fps"], 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """List of human-readable regressions against a previous run."""
+    problems = []
+    for name, old in baseline.get("results", {}).items():
+        new = results.get(name)
+        if new is None:
+            continue
+        for key in GATED:
+            if old.get(key) and new[key] > old[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {old[key]} -> {new[key]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NeoPixel effects on the simulated strip")
+    parser.add_argument("--leds", type=int, default=300)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--out", help="write the JSON report here as well as stdout")
+    parser.add_argument("--baseline", help="previous JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {}
+    for name, run in build_cases(args.leds, args.fps).items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = measure(run, args.leds, args.fps)
+
+    report = {
+        "meta": {"leds": args.leds, "fps": args.fps, "python": sys.version.split()[0]},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
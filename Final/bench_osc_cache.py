@@ -0,0 +1,99 @@
+"""
+OSC send-path microbenchmark.
+
+Times sending the game's fixed cues through python-osc's message builder
+(what every send did before) and from osc_pool's pre-encoded cache, to a
+local UDP socket. For each path it reports, as JSON, microseconds per send
+(best of --repeat runs) for:
+  - message   one /action/1007 1.0
+  - gma       one /gma3/cmd "Go Sequence 23 cue 1"
+  - bundle    Stop -> /marker/23 -> Play as one bundle
+and "encode_only" the same without the sendto(), i.e. the builder cost alone.
+
+"codec" compares osc_codec's OscEncoder/OscDecoder with python-osc's
+builder/parser for the shapes the game uses (one float, one string, a
+/print string list), in microseconds per message.
+
+    python3 bench_osc_cache.py --number 20000
+"""
+import sys
+import json
+import socket
+import timeit
+import argparse
+
+from pythonosc import osc_message
+
+import osc_pool
+from osc_codec import OscEncoder, OscDecoder
+
+SHAPES = {
+    "float":  ("/action/1007", 1.0),
+    "string": ("/gma3/cmd", "Go Sequence 23 cue 1"),
+    "press":  ("/print", ["Sensor 3 Pressed"]),
+}
+
+CASES = {
+    "message": [("/action/1007", 1.0)],
+    "gma":     [("/gma3/cmd", "Go Sequence 23 cue 1")],
+    "bundle":  [("/action/1016", 1.0), ("/marker/23", 1.0), ("/action/1007", 1.0)],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pre-encoded OSC sends against the builder")
+    parser.add_argument("--number", type=int, default=20000, help="sends per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+    built = osc_pool.OscClient("127.0.0.1", port)
+    cached = osc_pool.OscClient("127.0.0.1", port)
+
+    def us(func):
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        return round(best / args.number * 1e6, 3)
+
+    report = {"builder": {}, "cached": {}, "encode_only": {}}
+    for name, messages in CASES.items():
+        if len(messages) == 1:
+            address, value = messages[0]
+            cached.preload(messages)
+            report["builder"][name] = us(lambda: built.send_message(address, value))
+            report["cached"][name] = us(lambda: cached.send_message(address, value))
+            report["encode_only"][name] = us(lambda: osc_pool.build_message(address, value).dgram)
+        else:
+            cached.preload_bundle(messages)
+            report["builder"][name] = us(lambda: built.send_bundle(messages))
+            report["cached"][name] = us(lambda: cached.send_bundle(messages))
+            report["encode_only"][name] = us(lambda: osc_pool.build_bundle(messages).dgram)
+        print(f"{name}: builder {report['builder'][name]} us, cached {report['cached'][name]} us",
+              file=sys.stderr)
+    report["cached_sends"] = cached.stats()["cached"]
+    sink.close()
+
+    encoder, decoder = OscEncoder(), OscDecoder()
+    report["codec"] = {}
+    for name, (address, value) in SHAPES.items():
+        dgram = osc_pool.build_message(address, value).dgram
+        row = report["codec"][name] = {
+            "encode_builder_us": us(lambda: osc_pool.build_message(address, value).dgram),
+            "encode_codec_us": us(lambda: encoder.encode(address, value)),
+            "decode_parser_us": us(lambda: osc_message.OscMessage(dgram).params),
+            "decode_codec_us": us(lambda: decoder.decode(dgram)),
+        }
+        print(f"{name}: encode {row['encode_builder_us']} -> {row['encode_codec_us']} us, "
+              f"decode {row['decode_parser_us']} -> {row['decode_codec_us']} us", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+OSC ingest benchmark.
+
+Sends bursts of /print messages over localhost UDP to python-osc's
+ThreadingOSCUDPServer (the old receive path) and to osc_ingest.IngestServer
+(the current one), and reports for each, as JSON:
+  - packets_per_s   messages handled per second of the run
+  - latency_ms      send -> handler finished: mean, p50, p99, max
+  - received        messages that reached the handler (of `sent`)
+  - counted         the handler's `count += 1` total; less than `received`
+                    means concurrent handlers lost updates
+  - threads_peak    most threads alive at once
+
+    python3 bench_osc_ingest.py --packets 20000 --burst 50
+    python3 bench_osc_ingest.py --work-us 200 --out ingest.json
+"""
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import statistics
+
+from pythonosc import dispatcher, osc_server, osc_message_builder
+
+import osc_ingest
+from percentiles import percentiles
+
+
+class Target:
+    """Handler shared by both servers: records when each message was handled."""
+
+    def __init__(self, packets, work_s):
+        self.done = [None] * packets
+        self.count = 0
+        self.work_s = work_s
+        self.threads_peak = 0
+        self.finished = threading.Event()
+        self.packets = packets
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def handle(self, address, seq, *args):
+        count = self.count        # the game's read-modify-write on a global
+        if self.work_s:
+            end = time.perf_counter() + self.work_s
+            while time.perf_counter() < end:
+                pass
+        self.count = count + 1
+        self.threads_peak = max(self.threads_peak, threading.active_count())
+        self.done[seq] = time.perf_counter()
+        with self._lock:
+            self.received += 1
+            if self.received == self.packets:
+                self.finished.set()
+
+
+def threading_server(target):
+    disp = dispatcher.Dispatcher()
+    disp.map("/print", target.handle)
+    server = osc_server.ThreadingOSCUDPServer(("127.0.0.1", 0), disp)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1], server.shutdown
+
+
+def ingest_server(target):
+    server = osc_ingest.IngestServer("127.0.0.1", 0)
+    server.map("/print", target.handle)
+    server.start()
+    return server.port, server.shutdown
+
+
+SERVERS = {"threading": threading_server, "asyncio": ingest_server}
+
+
+def run(make_server, packets, burst, gap_s, work_s, timeout):
+    target = Target(packets, work_s)
+    port, stop = make_server(target)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    datagrams = []
+    for seq in range(packets):
+        msg = osc_message_builder.OscMessageBuilder(address="/print")
+        msg.add_arg(seq)
+        msg.add_arg("Sensor 1 Pressed")
+        datagrams.append(msg.build().dgram)
+
+    sent = [0.0] * packets
+    start = time.perf_counter()
+    for seq, dgram in enumerate(datagrams):
+        sent[seq] = time.perf_counter()
+        sock.sendto(dgram, ("127.0.0.1", port))
+        if (seq + 1) % burst == 0:
+            time.sleep(gap_s)
+    target.finished.wait(timeout)
+    stop()
+    sock.close()
+
+    handled = [d for d in target.done if d is not None]
+    latency = [(d - s) * 1000 for d, s in zip(target.done, sent) if d is not None]
+    elapsed = (max(handled) - start) if handled else 0.0
+    p = percentiles(latency, (50, 99))
+
+    return {
+        "sent": packets,
+        "received": len(handled),
+        "counted": target.count,
+        "packets_per_s": round(len(handled) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latency), 4) if latency else 0.0,
+            "p50": p["p50"],
+            "p99": p["p99"],
+            "max": round(max(latency), 4) if latency else 0.0,
+        },
+        "threads_peak": target.threads_peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OSC receive path on localhost")
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=50, help="packets sent back to back before a pause")
+    parser.add_argument("--gap-ms", type=float, default=5.0, help="pause between bursts")
+    parser.add_argument("--work-us", type=float, default=0.0, help="busy time spent in the handler per message")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--only", choices=sorted(SERVERS))
+    parser.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    report = {}
+    for name, make_server in SERVERS.items():
+        if args.only and name != args.only:
+            continue
+        report[name] = run(make_server, args.packets, args.burst, args.gap_ms / 1000,
+                           args.work_us / 1e6, args.timeout)
+        print(f"{name}: {report[name]['packets_per_s']} packets/s, "
+              f"p99 {report[name]['latency_ms']['p99']} ms", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,28 @@
+import os
 import time
 import threading
 import tkinter as tk
-from rpi_ws281x import Adafruit_NeoPixel, Color
-from pythonosc import udp_client, dispatcher, osc_server
+# LUMEN_SIMULATE_LEDS=1 runs the game without a strip (neopixel_sim.py). It is
+# never picked on its own, so a broken rpi_ws281x install fails here instead
+# of running the game with dark LEDs.
+if os.environ.get("LUMEN_SIMULATE_LEDS"):
+    print("LUMEN_SIMULATE_LEDS is set: driving the simulated strip, not the LEDs")
+    from neopixel_sim import Adafruit_NeoPixel, Color
+else:
+    from rpi_ws281x import Adafruit_NeoPixel, Color
+import osc_pool
+import osc_ingest
+import osc_schedule
+import latency_trace
+from led_engine import LedEngine, PRIORITY_ALERT
+from led_compositor import DEFAULT_LAYERS
+from led_color import ColorPipeline
+from led_segments import MultiStrip
+from led_spatial import PixelMap, glow
+from led_cache import EffectCache, play
+from led_progress import ProgressBar
+from led_effects import flash, red_dim, green_dim, flash_bpm
+from led_shows import LEVEL_START_SHOWS, compile_shows
 
 # By Ye Shuchang
 
@@ -11,65 +31,109 @@ GMA_IP, GMA_PORT       = "192.168.254.213", 2000
 REAPER_IP, REAPER_PORT = "192.168.254.12",   8000
 LOCAL_IP, LOCAL_PORT   = "192.168.254.108",  8006
 
-gma    = udp_client.SimpleUDPClient(GMA_IP, GMA_PORT)
-reaper = udp_client.SimpleUDPClient(REAPER_IP, REAPER_PORT)
+# One shared socket per destination (osc_pool.py). Sends are queued and go
+# out on a background thread per destination, so a slow network never holds
+# up sensor handling or the window. osc_pool.stats() has counts and latency.
+gma    = osc_pool.sender(GMA_IP, GMA_PORT)
+reaper = osc_pool.sender(REAPER_IP, REAPER_PORT)
+
+# Cues that must go out a set time apart (osc_schedule.py)
+cues = osc_schedule.CueScheduler()
+
+# Sensor input: handlers run one at a time on the ingest thread (osc_ingest.py)
+server = osc_ingest.IngestServer(LOCAL_IP, LOCAL_PORT)
+
+# Every press is traced from the sensor to the LEDs and the cues going out
+# (latency_trace.py); per-stage percentiles are printed on exit. Set to a
+# file name (e.g. "press_trace.json") to also save the recent presses as a
+# Chrome trace, viewable in chrome://tracing or ui.perfetto.dev.
+tracer = latency_trace.Tracer()
+LATENCY_TRACE_FILE = None
 
 # -------- LED Strip Setup --------
-LED_COUNT = 300
-strip = Adafruit_NeoPixel(LED_COUNT, 18, 800000, 10, False, 128)
+# One entry per physical strip: (LEDs, GPIO pin, DMA channel, PWM channel).
+# More strips are joined end to end into one canvas. Strips on GPIO 18 (PWM)
+# and GPIO 21 (PCM), each with its own DMA channel, send in parallel, so
+# 2 x 300 LEDs refresh as fast as 300. A strip on GPIO 10 (SPI) has no DMA
+# and sends after the others (see led_segments.py).
+LED_STRIPS = [
+    (300, 18, 10, 0),
+]
+strips = [Adafruit_NeoPixel(n, pin, 800000, dma, False, 255, channel)  # brightness is set in the pipeline below
+          for n, pin, dma, channel in LED_STRIPS]
+strip = strips[0] if len(strips) == 1 else MultiStrip(strips)
 strip.begin()
-
-# -------- Lighting Effect Functions (unchanged) --------
-def light_up(n, color):
-    for i in range(n):
-        strip.setPixelColor(i, color)
-    strip.show()
-
-def red_dim(n):
-    for i in range(n - 1, -1, -1):
-        strip.setPixelColor(i, Color(255, 0, 0))
-        strip.show()
-        time.sleep(0.005)
-        strip.setPixelColor(i, 0)
-        strip.show()
-    for _ in range(5):
-        light_up(n, Color(255, 0, 0))
-        time.sleep(0.3)
-        light_up(n, 0)
-        time.sleep(0.3)
-    light_up(n, 0)
-
-def green_dim(n):
-    for i in range(n - 1, -1, -1):
-        strip.setPixelColor(i, Color(0, 255, 0))
-        strip.show()
-        time.sleep(0.005)
-        strip.setPixelColor(i, 0)
-        strip.show()
-
-def flash_bpm(n, bpm=120, duration=5):
-    delay = 60 / bpm / 2
-    for _ in range(int(duration / (delay * 2))):
-        light_up(n, Color(0, 255, 0))
-        time.sleep(delay)
-        light_up(n, 0)
-        time.sleep(delay)
-
-def level_start_sequence(level):
-    blink = {1: 0.3, 2: 0.2, 3: 0.15, 4: 0.1}.get(level, 0.25)
-    for _ in range(6):  # 3 blue flashes (on/off)
-        light_up(LED_COUNT, Color(0, 0, 255))
-        time.sleep(blink)
-        light_up(LED_COUNT, 0)
-        time.sleep(blink)
-    light_up(LED_COUNT, Color(0, 255, 0))  # solid green once
-    time.sleep(2)
-    light_up(LED_COUNT, 0)
+LED_COUNT = strip.numPixels()
+
+# Effects are drawn in linear RGB; gamma, white balance and brightness are
+# applied per frame through lookup tables on the way out (led_color.py).
+LED_BRIGHTNESS = 128
+LED_WHITE_BALANCE = (1.0, 1.0, 1.0)  # lower a channel to warm/cool the whites
+color_pipeline = ColorPipeline(gamma=2.2, white=LED_WHITE_BALANCE, brightness=LED_BRIGHTNESS)
+
+# All strip.show() calls happen on the LED engine's render thread. The
+# layers (background, progress, overlay, alert) play at the same time and
+# are blended once per frame, so a flash no longer wipes the progress bar.
+leds = LedEngine(strip, fps=60, layers=DEFAULT_LAYERS, color=color_pipeline)
+leds.start()
+
+# Set to a file name (e.g. "show.ledrec") to log every frame the strip shows;
+# inspect or replay it later with `python3 led_record.py info|replay <file>`.
+LED_RECORD_FILE = None
+if LED_RECORD_FILE:
+    leds.start_recording(LED_RECORD_FILE)
+
+# -------- Lighting Effect Functions --------
+# The effects live in led_effects.py; they draw into one of the engine's layers
+# ("overlay" unless told otherwise).
+
+# Milestone progress bar: grows smoothly, only drawing the newly lit LEDs.
+progress_bar = ProgressBar(leds)
+PROGRESS_PER_PRESS = True  # False = only move the bar at the four milestones
+
+# -------- Pre-rendered effects --------
+# The effects above are deterministic, so each one is rendered once and then
+# replayed from the cache (kept on disk so a restarted Pi skips rendering).
+EFFECT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "effect_cache")
+effects = EffectCache(LED_COUNT, leds.fps, path=EFFECT_CACHE_DIR)
+
+def cached(effect, *args, layer=None):
+    return play(leds.layer(layer), effects.get(effect, *args))
+
+# Stage start shows are tables in led_shows.py (swap in LEVEL_START_SHOWS_MVP,
+# which the MVP plays, for its per-level colours); they are compiled to frames
+# right here.
+level_shows = compile_shows(LEVEL_START_SHOWS, LED_COUNT, leds.fps)
+
+def level_start_show(level, layer=None):
+    show = level_shows.get(level, level_shows["default"])
+    return play(leds.layer(layer), show)
+
+# Where each LED sits on the board, for the 2D effects in led_spatial.py.
+PIXEL_MAP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pixel_map.json")
+pixel_map = PixelMap.load(PIXEL_MAP_FILE, LED_COUNT)
+PRESS_GLOW = False  # True = a short glow from the middle of the glyph on every press
+
+def press_glow(color):
+    # Background layer, under the bar; a new press replaces the last glow.
+    leds.cancel_all(layer="background")
+    leds.submit(glow(leds.layer("background"), pixel_map, color), layer="background")
+
+def warm_effect_cache():
+    effects.get(red_dim, LED_COUNT)
+    effects.get(green_dim, LED_COUNT)
+    effects.get(flash_bpm, LED_COUNT)
+    effects.get(flash, LED_COUNT, Color(0, 255, 0), 2)
+    effects.get(flash, LED_COUNT, Color(255, 0, 0), 2)
+
+def shutdown_cues():
+    """(destination, message) pairs that stop the milestone sequences and rewind REAPER."""
+    offs = [(gma, ("/gma3/cmd", f"Off Sequence {cue}")) for cue in ["23 cue 1", "23 cue 2", "23 cue 3", "23 cue 4"]]
+    return offs + [(reaper, ("/action/40042", 1.0))]
 
 def shutdown_sequences():
-    for cue in ["23 cue 1", "23 cue 2", "23 cue 3", "23 cue 4"]:
-        gma.send_message("/gma3/cmd", f"Off Sequence {cue}")
-    reaper.send_message("/action/40042", 1.0)
+    for dest, message in shutdown_cues():
+        dest.send_message(*message)
 
 # -------- Game State & Milestones --------
 count      = 0
@@ -79,6 +143,7 @@ timing     = False
 timeout    = False
 ready      = False
 waiting    = False
+playing_out = False  # a stage win or game over is still playing; presses are ignored
 start_time = None
 level      = 1
 MAX_LEVEL  = 4
@@ -176,8 +241,12 @@ def get_stage_color(lvl):
 
 # Single, consistent trigger that expects a FULL OSC address (e.g., "/action/41261")
 def trigger_reaper(addr, msg=1.0):
-    client = udp_client.SimpleUDPClient(REAPER_IP, REAPER_PORT)
-    client.send_message(addr, msg)
+    reaper.send_message(addr, msg)
+
+# Several REAPER commands (e.g. Stop -> marker -> Play) in one OSC bundle:
+# one datagram, so REAPER gets them together instead of across two polls.
+def trigger_reaper_bundle(*addrs, msg=1.0):
+    reaper.send_bundle([(addr, msg) for addr in addrs])
 
 # ---- BGM resume helper (non-blocking) ----
 bgm_timer = None
@@ -188,23 +257,64 @@ def play_sfx_then_bgm(sfx_addr, sfx_hold=1.2):
     """
     global bgm_timer
     # Start SFX: Stop -> SFX -> Play
-    trigger_reaper(addr16)
-    trigger_reaper(sfx_addr)
-    trigger_reaper(addr15)
+    trigger_reaper_bundle(addr16, sfx_addr, addr15)
 
     # Cancel any previous scheduled return to BGM
     if bgm_timer is not None and bgm_timer.is_alive():
         bgm_timer.cancel()
 
     def _back_to_bgm():
-        trigger_reaper(addr16)
-        trigger_reaper(addr13)   # BGM Start marker (loop)
-        trigger_reaper(addr15)
+        trigger_reaper_bundle(addr16, addr13, addr15)   # Stop -> BGM Start marker (loop) -> Play
 
     bgm_timer = threading.Timer(sfx_hold, _back_to_bgm)
     bgm_timer.daemon = True
     bgm_timer.start()
 
+# ---- Pre-encoded cues (osc_pool preload) ----
+GMA_FIXED_CMDS = [
+    "Level Start", "Win Stage", "Lose Stage",
+    "Go+ sequence 32", "Go+ sequence 33", "Go Sequence 104 cue 1", "Go Sequence 103 cue 1",
+    "Go Sequence 102 cue 5", "Go+ Sequence 102",
+] + [f"Level {n} Start" for n in goals] + [f"Off Sequence 23 cue {n}" for n in range(1, 5)]
+
+def preload_osc_cache():
+    """Encode every fixed cue once, so sending one is a single sendto() of ready bytes."""
+    gma_cmds = set(GMA_FIXED_CMDS)
+    gma_cmds.update(cmd for cmds in gma_milestone_cmds.values() for cmd in cmds)
+    gma_cmds.update(f"Go Sequence {seq} cue {cue}" for seq, cs in cues_map.items() for cue in cs)
+    gma.client.preload(("/gma3/cmd", cmd) for cmd in sorted(gma_cmds))
+
+    sounds = [a for a in audio_cmds.values() if a] + [addr6, addr7, addr8]
+    reaper.client.preload((a, 1.0) for a in sounds + [addr15, addr16, "/action/40042"])
+    for a in sounds:
+        reaper.client.preload_bundle([(addr16, 1.0), (a, 1.0), (addr15, 1.0)])  # Stop -> X -> Play
+        reaper.client.preload_bundle([(a, 1.0), (addr15, 1.0)])                 # X -> Play
+
+def schedule_win_cues(game_win, on_done=None):
+    """
+    The stage win cues, in the order they always followed the animation:
+    Stage Win audio once the green pulse ends; once the sweep ends the GrandMA
+    win commands, the sequence shutdown and, on the last level, the Game Win
+    cues. They are timed by the cue scheduler from the effects' lengths rather
+    than hung on the LED jobs: a manual restart cuts the effects short, and
+    must not drop the cues. on_done() runs on the scheduler thread once the
+    last cue is sent.
+    """
+    pulse = effects.get(flash_bpm, LED_COUNT).duration
+    sweep = pulse + effects.get(green_dim, LED_COUNT).duration
+    entries = [
+        (pulse, reaper.client, [(addr16, 1.0), (addr9, 1.0), (addr15, 1.0)]),   # Stop -> /action/41270 -> Play
+        (sweep, gma.client, ("/gma3/cmd", "Win Stage")),
+        (sweep, gma.client, ("/gma3/cmd", "Go+ sequence 33")),                 # follow-up lighting
+    ]
+    entries += [(sweep, dest.client, message) for dest, message in shutdown_cues()]   # stop all sequences before next stage
+    if game_win:
+        entries += [
+            (sweep, gma.client, ("/gma3/cmd", "Go Sequence 103 cue 1")),
+            (sweep, reaper.client, [(addr16, 1.0), (addr11, 1.0), (addr15, 1.0)]),     # Stop -> /marker/21 (Game Win) -> Play
+        ]
+    cues.schedule(entries, on_done)
+
 # Optional: set different SFX holds per milestone index (1..4)
 SFX_HOLDS = {1: 1.2, 2: 1.2, 3: 1.2, 4: 1.2}
 
@@ -246,8 +356,8 @@ class GameUI:
         self.root.bind("<space>", self.start_sequence)
 
         # NEW: manual restart hotkey (R or r) to trigger countdown -> re-arm
-        self.root.bind("r", lambda e: self.restart_countdown(3))
-        self.root.bind("R", lambda e: self.restart_countdown(3))
+        self.root.bind("r", lambda e: self.restart_countdown(3, cancel_effects=True))
+        self.root.bind("R", lambda e: self.restart_countdown(3, cancel_effects=True))
 
         self._restart_active = False  # internal guard to avoid overlapping countdowns
 
@@ -271,17 +381,19 @@ class GameUI:
                 self.labels[key].config(fg=color)
 
     def start_sequence(self, e=None):
-        global ready
         self.update("game", "Startup", "orange")
-        gma.send_message("/gma3/cmd", "Go Sequence 102 cue 5")
-        time.sleep(0.2)
-        gma.send_message("/gma3/cmd", "Go+ Sequence 102")
-        time.sleep(0.2)
-        gma.send_message("/gma3/cmd", "Go+ Sequence 102")
+        # Sent 0.2 s apart by the cue scheduler; the window stays responsive meanwhile.
+        # on_done runs on the scheduler thread, so hand the rest back to Tk.
+        cues.schedule([
+            (0.0, gma.client, ("/gma3/cmd", "Go Sequence 102 cue 5")),
+            (0.2, gma.client, ("/gma3/cmd", "Go+ Sequence 102")),
+            (0.4, gma.client, ("/gma3/cmd", "Go+ Sequence 102")),
+        ], on_done=lambda: self.root.after(0, self._startup_done))
+
+    def _startup_done(self):
+        global ready
         # Transport: Stop -> BGM -> Play
-        trigger_reaper(addr16)   # Stop
-        trigger_reaper(addr13)   # BGM Start (loop marker)
-        trigger_reaper(addr15)   # Play
+        trigger_reaper_bundle(addr16, addr13, addr15)
         ready = True
         self.update("game", "Ready", "blue")
 
@@ -303,15 +415,21 @@ class GameUI:
         self.update("game", f"Audio: {label}", "purple")
 
     # NEW: Restart countdown that forces re-arm after countdown
-    def restart_countdown(self, seconds=3):
+    def restart_countdown(self, seconds=3, cancel_effects=False):
         """
         Show a GUI countdown, then require re-arming (next sensor press arms).
         Uses Tk 'after' to keep UI responsive and avoid thread issues.
+        A manual restart also cuts off whatever the strip is still playing.
         """
         global waiting, timing, start_time, timeout
         if self._restart_active:
             return  # already counting down
 
+        if cancel_effects:
+            leds.cancel_all()
+            progress_bar.reset()
+            leds.blank()
+
         self._restart_active = True
         timing = False
         start_time = None
@@ -335,15 +453,17 @@ class GameUI:
 
 # -------- OSC Handler --------
 def print_args(addr_incoming, *args):
-    global count, started, timing, start_time, timeout, level, tries, waiting, played_milestones, ready
+    global count, started, timing, start_time, timeout, level, tries, waiting, played_milestones, ready, playing_out
 
-    if not ready:
+    if not ready or playing_out:
         return
 
     # If we're between stages waiting for the next stage to arm
     if waiting:
         played_milestones.clear()          # reset milestone dedupe for new level
-        level_start_sequence(level)        # (blue flashes x3, then green once)
+        leds.cancel_all()                  # drop any fail animation still playing
+        progress_bar.reset()
+        leds.submit(level_start_show(level))  # (blue flashes, then green once)
         gma.send_message("/gma3/cmd", f"Level {level} Start")
         ui.update("level", f"Level: {level}")
         ui.update("tries", "Tries Left: 3")
@@ -358,14 +478,11 @@ def print_args(addr_incoming, *args):
 
         # ---------------- Stage ARMED audio per level: SFX + Play (no Stop) ----------------
         if level == 1:
-            trigger_reaper(addr6)   # /action/41267
-            trigger_reaper(addr15)  # /action/1007
+            trigger_reaper_bundle(addr6, addr15)   # /action/41267 + /action/1007
         elif level == 2:
-            trigger_reaper(addr7)   # /action/41268
-            trigger_reaper(addr15)  # /action/1007
+            trigger_reaper_bundle(addr7, addr15)   # /action/41268 + /action/1007
         elif level in (3, 4):
-            trigger_reaper(addr8)   # /action/41269
-            trigger_reaper(addr15)  # /action/1007
+            trigger_reaper_bundle(addr8, addr15)   # /action/41269 + /action/1007
         # -------------------------------------------------------------------------------
 
         return
@@ -374,7 +491,8 @@ def print_args(addr_incoming, *args):
     if not started:
         started = True
         played_milestones.clear()
-        level_start_sequence(level)        # (blue flashes x3, then green once)
+        progress_bar.reset()
+        leds.submit(level_start_show(level))  # (blue flashes, then green once)
         gma.send_message("/gma3/cmd", "Level Start")
         ui.update("level", f"Level: {level}")
         ui.update("tries", "Tries Left: 3")
@@ -383,8 +501,7 @@ def print_args(addr_incoming, *args):
 
         # ---------------- Initial Stage 1 ARMED audio: SFX + Play (no Stop) -------------
         if level == 1:
-            trigger_reaper(addr6)   # /action/41267
-            trigger_reaper(addr15)  # /action/1007
+            trigger_reaper_bundle(addr6, addr15)   # /action/41267 + /action/1007
         # -------------------------------------------------------------------------------
 
         return
@@ -402,25 +519,26 @@ def print_args(addr_incoming, *args):
 
     # Regular counting press
     count += 1
-    if count in milestones.get(level, []):
+    if PROGRESS_PER_PRESS or count in milestones.get(level, []):
         progress = int(LED_COUNT * (count / goals[level]))
-        light_up(progress, get_stage_color(level))
+        progress_bar.advance(progress, get_stage_color(level))
+    if PRESS_GLOW:
+        press_glow(get_stage_color(level))
+    if count in milestones.get(level, []):
         trigger_osc(count)
 
     # Stage complete
     if count == goals[level]:
-        flash_bpm(LED_COUNT)               # green pulse x3 (duration-limited)
-        # --- Stage Win audio AFTER green wipe: 41270 + Play (no Stop) ---
-        trigger_reaper(addr16)             # Stop (transport)
-        trigger_reaper(addr9)              # /action/41270
-        trigger_reaper(addr15)             # /action/1007
-        # --- NeoPixel green sweep + BGM Start (loop) ---
-        green_dim(LED_COUNT)               # green sweep
-        # --- GrandMA commands for stage win ---
-        gma.send_message("/gma3/cmd", "Win Stage")
-        gma.send_message("/gma3/cmd", "Go+ sequence 33")   # follow-up lighting
-        # --- Stop all sequences before next stage ---
-        shutdown_sequences()
+        progress_bar.reset()  # the bar shows through black, so clear it for the full-strip pulse
+        leds.submit(cached(flash_bpm, LED_COUNT))  # green pulse (duration-limited)
+        # --- NeoPixel green sweep ---
+        leds.submit(cached(green_dim, LED_COUNT))
+        # --- Stage Win audio AFTER green pulse; GrandMA win commands, shutdown
+        #     and (last level) Game Win cues after the sweep ---
+        # Presses are ignored until the win has played out, as when this
+        # blocked: arming the next stage earlier would land these cues inside it.
+        playing_out = True
+        schedule_win_cues(game_win=level == MAX_LEVEL, on_done=lambda: server.call_soon(stage_won))
         ui.update("result", "Stage: Win", "green")
 
         # Pause timer; wait for next press to arm next stage
@@ -430,82 +548,146 @@ def print_args(addr_incoming, *args):
         ui.update("time", "Time: Paused")
 
         if level == MAX_LEVEL:
-            # --- Game Win audio remains present ---
-            gma.send_message("/gma3/cmd", "Go Sequence 103 cue 1")
-            trigger_reaper(addr16)             # Stop (transport)
-            trigger_reaper(addr11)             # /marker/21 — Game Win
-            trigger_reaper(addr15)             # Play
-            light_up(LED_COUNT, Color(0, 255, 0))
-            time.sleep(2)
-            light_up(LED_COUNT, 0)
-            ui.update("game", "Game: Win", "green")
-            started = False
-            return
-
-        level += 1
-        waiting = True   # next press arms next stage
+            # --- Game Win audio remains present (schedule_win_cues, after the sweep) ---
+            leds.submit(cached(flash, LED_COUNT, Color(0, 255, 0), 2))
         return
 
-# -------- Main game loop & OSC Server --------
-def start_game_logic():
-    global timeout, tries, waiting, started, timing, start_time, count, level
+def stage_won():
+    """The win cues are out: wait for the next stage to be armed, or end the game."""
+    global level, waiting, playing_out
+    if level == MAX_LEVEL:
+        # the green game-win flash is still on; the game ends when it does
+        hold = effects.get(flash, LED_COUNT, Color(0, 255, 0), 2).duration
+        server.call_later(hold, game_ended, "Game: Win", "green")
+        return
 
-    disp = dispatcher.Dispatcher()
-    disp.map("/print", print_args)
-    disp.set_default_handler(lambda a, *b: print(f"Unhandled OSC: {a}, {b}"))
+    playing_out = False
+    level += 1
+    waiting = True   # next press arms next stage
 
-    server = osc_server.ThreadingOSCUDPServer((LOCAL_IP, LOCAL_PORT), disp)
-    threading.Thread(target=server.serve_forever, daemon=True).start()
+def game_ended(text, color):
+    """The last win or fail animation is over: the next press starts a new game."""
+    global started, playing_out
+    ui.update("game", text, color)
+    started = False
+    playing_out = False
+
+# -------- Main game loop & OSC Server --------
+def game_over_flash():
+    # Full red for 2 s on the alert layer, over everything else
+    leds.submit(cached(flash, LED_COUNT, Color(255, 0, 0), 2, layer="alert"),
+                PRIORITY_ALERT, layer="alert")
+
+def check_timer():
+    """Once per tick: update the countdown and handle a stage running out of time."""
+    global timeout, tries, timing, start_time, playing_out
+
+    if timing and not timeout:
+        elapsed = time.time() - start_time
+        remaining = times.get(level, 30) - elapsed
+        ui.update("time", f"Time: {max(0, int(remaining))}")
+
+        if elapsed > times[level] and count < goals[level]:
+            timeout = True
+            tries += 1
+            # stage fail lighting & audio (bar cleared so the blinks go fully dark);
+            # on the last try the red game-over flash follows the blinks
+            progress_bar.reset()
+            leds.submit(cached(red_dim, LED_COUNT), on_done=game_over_flash if tries >= 3 else None)
+            gma.send_message("/gma3/cmd", "Lose Stage")
+            # Stop -> Stage Lose -> Play
+            trigger_reaper_bundle(addr16, addr10, addr15)
+            ui.update("result", "Stage: Fail", "red")
+
+            if tries >= 3:
+                # game lose sequence
+                gma.send_message("/gma3/cmd", "Go+ sequence 32")  # follow-up lighting
+                gma.send_message("/gma3/cmd", "Go Sequence 104 cue 1")
+                # Stop -> Game Lose -> Play
+                trigger_reaper_bundle(addr16, addr12, addr15)
+                # Presses are ignored until the blinks and the red flash are over
+                playing_out = True
+                hold = (effects.get(red_dim, LED_COUNT).duration
+                        + effects.get(flash, LED_COUNT, Color(255, 0, 0), 2).duration)
+                server.call_later(hold, game_ended, "Game: Lose", "red")
+                timing = False
+                ui.update("time", "Time: Paused")
+            else:
+                # NEW: show GUI countdown, then require re-arming on next press
+                timing = False
+                start_time = None
+                ui.update("time", "Time: Paused")
+                ui.restart_countdown(3)
+
+# Everything one press or one tick sends (a stage win is 8+ packets to two
+# hosts) goes out as one burst: a single sendmmsg() where available.
+def on_press(address, *args):
+    trace = tracer.begin(args, server.event.received, server.event.source)
+    requests = leds.requests
+    with osc_pool.burst(on_sent=trace.closer("osc")):
+        print_args(address, *args)
+    trace.end("handler")
+    if leds.requests != requests:
+        leds.after_show(trace.closer("led"))
+
+def on_tick():
+    with osc_pool.burst():
+        check_timer()
+
+stopping = threading.Event()
+
+def start_game_logic():
+    # Presses and the timer check all run on the ingest thread, one at a time,
+    # so they never change count/tries/level underneath each other.
+    server.map("/print", on_press)
+    server.set_default_handler(lambda a, *b: print(f"Unhandled OSC: {a}, {b}"))
+    server.start()
     print(f"OSC server listening on {LOCAL_IP}:{LOCAL_PORT}")
 
-    try:
-        while True:
-            if timing and not timeout:
-                elapsed = time.time() - start_time
-                remaining = times.get(level, 30) - elapsed
-                ui.update("time", f"Time: {max(0, int(remaining))}")
-
-                if elapsed > times[level] and count < goals[level]:
-                    timeout = True
-                    # stage fail lighting & audio
-                    red_dim(LED_COUNT)
-                    gma.send_message("/gma3/cmd", "Lose Stage")
-                    # Stop -> Stage Lose -> Play
-                    trigger_reaper(addr16)             # Stop
-                    trigger_reaper(addr10)             # Stage lose marker
-                    trigger_reaper(addr15)             # Play
-                    ui.update("result", "Stage: Fail", "red")
-
-                    tries += 1
-                    if tries >= 3:
-                        # game lose sequence
-                        gma.send_message("/gma3/cmd", "Go+ sequence 32")  # follow-up lighting
-                        gma.send_message("/gma3/cmd", "Go Sequence 104 cue 1")
-                        # Stop -> Game Lose -> Play
-                        trigger_reaper(addr16)             # Stop
-                        trigger_reaper(addr12)             # Game lose marker
-                        trigger_reaper(addr15)             # Play
-                        light_up(LED_COUNT, Color(255, 0, 0))
-                        time.sleep(2)
-                        light_up(LED_COUNT, 0)
-                        ui.update("game", "Game: Lose", "red")
-                        started = False
-                        timing = False
-                        ui.update("time", "Time: Paused")
-                    else:
-                        # NEW: show GUI countdown, then require re-arming on next press
-                        timing = False
-                        start_time = None
-                        ui.update("time", "Time: Paused")
-                        ui.restart_countdown(3)
-
-            time.sleep(0.1)
+    while not stopping.wait(0.1):
+        server.call_soon(on_tick)
 
-    except KeyboardInterrupt:
-        server.shutdown()
-        print("OSC server stopped.")
+def shut_down():
+    """
+    Stop input and the LEDs and print what this run measured. Runs on the
+    main thread once the window closes or Ctrl+C ends mainloop(): the game
+    logic thread is a daemon and never sees the KeyboardInterrupt.
+    """
+    stopping.set()
+    server.shutdown()
+    leds.stop()
+    print("OSC server stopped.")
+    s = server.stats()
+    print(f"OSC in: {s['packets']} packets, {s['errors']} errors, "
+          f"handled in avg {s['avg_ms']} ms, p99 {s['p99_ms']} ms, max {s['max_ms']} ms")
+    c = cues.stats()
+    print(f"Timed cues: {c['dispatched']} sent, late by avg {c['avg_late_ms']} ms, "
+          f"p99 {c['p99_late_ms']} ms, max {c['max_late_ms']} ms")
+    osc_pool.flush()
+    b = osc_pool.burst_stats()
+    print(f"OSC bursts: {b['bursts']} bursts, {b['datagrams']} packets in {b['syscalls']} system calls "
+          f"({b['saved']} saved, sendmmsg {'on' if b['sendmmsg'] else 'off'})")
+    for dest, s in osc_pool.stats().items():
+        print(f"OSC {dest}: {s['sends']} sent ({s['cached']} pre-encoded), {s['errors']} failed, "
+              f"avg {s['avg_ms']} ms, max {s['max_ms']} ms")
+        q = s.get("queue")
+        if q:
+            print(f"    queue: max depth {q['max_depth']}, {q['dropped']} dropped, "
+                  f"avg wait {q['avg_wait_ms']} ms, max wait {q['max_wait_ms']} ms")
+    for stage, t in tracer.summary().items():
+        print(f"Press latency {stage}: {t['count']} presses, p50 {t['p50']} ms, "
+              f"p95 {t['p95']} ms, p99 {t['p99']} ms, max {t['max']} ms")
+    if LATENCY_TRACE_FILE:
+        print(f"Press trace saved to {tracer.export_chrome(LATENCY_TRACE_FILE)}")
 
 if __name__ == "__main__":
+    warm_effect_cache()
+    preload_osc_cache()
     ui = GameUI()
     threading.Thread(target=start_game_logic, daemon=True).start()
-    ui.root.mainloop()
+    try:
+        ui.root.mainloop()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shut_down()
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from pythonosc import udp_client
+import osc_pool
 import threading
 import time
 import random
@@ -12,8 +12,8 @@ class AVControlGUI:
         self.REAPER_IP, self.REAPER_PORT = "192.168.254.12", 8000
 
         # Set up OSC clients
-        self.gma_client = udp_client.SimpleUDPClient(self.GMA_IP, self.GMA_PORT)
-        self.reaper_client = udp_client.SimpleUDPClient(self.REAPER_IP, self.REAPER_PORT)
+        self.gma_client = osc_pool.client(self.GMA_IP, self.GMA_PORT)
+        self.reaper_client = osc_pool.client(self.REAPER_IP, self.REAPER_PORT)
 
         # -------- Window --------
         self.root = tk.Tk()
@@ -110,6 +110,10 @@ class AVControlGUI:
             "phtography": "Go sequence 120 cue 1"
         }
 
+        # Encode every fixed cue once; sending one is then a single sendto()
+        self.reaper_client.preload((address, 1.0) for address in self.reaper_addresses.values())
+        self.gma_client.preload(("/gma3/cmd", command) for command in self.gma_cues.values())
+
         # Build UI
         self._build_ui()
 
@@ -411,11 +415,19 @@ class AVControlGUI:
             self.log_command(f"ERROR   REAPER {address} → {str(e)}")
             messagebox.showerror("REAPER Error", f"Failed to send: {address}\n{str(e)}")
 
+    def trigger_reaper_bundle(self, *addresses, msg=1.0):
+        # One OSC bundle: REAPER gets e.g. Stop -> marker -> Play in one datagram
+        try:
+            self.reaper_client.send_bundle([(address, msg) for address in addresses])
+            self.log_command(f"REAPER  {' + '.join(addresses)} → {msg}")
+        except Exception as e:
+            self.log_command(f"ERROR   REAPER {' + '.join(addresses)} → {str(e)}")
+            messagebox.showerror("REAPER Error", f"Failed to send: {' + '.join(addresses)}\n{str(e)}")
+
     def trigger_reaper_and_play(self, address, name):
         def sequence():
             try:
-                self.trigger_reaper(address)
-                self.trigger_reaper("/action/1007")
+                self.trigger_reaper_bundle(address, "/action/1007")
                 self.log_command(f"SEQUENCE {name} → Jump + Play")
             except Exception as e:
                 self.log_command(f"ERROR   SEQUENCE {name} → {str(e)}")
@@ -444,34 +456,27 @@ class AVControlGUI:
     # ---------- Quick Actions ----------
     def game_startup(self):
         def startup_sequence():
-            self.trigger_reaper("/marker/23")
-            self.trigger_reaper("/action/1007")
+            self.trigger_reaper_bundle("/marker/23", "/action/1007")
             self.log_command("GAME    Startup sequence completed")
         threading.Thread(target=startup_sequence, daemon=True).start()
 
     def win_stage(self):
         def win_sequence():
-            self.trigger_reaper("/action/1016")
-            self.trigger_reaper("/action/41270")
-            self.trigger_reaper("/action/1007")
+            self.trigger_reaper_bundle("/action/1016", "/action/41270", "/action/1007")
             self.log_command("GAME    Win stage sequence")
         threading.Thread(target=win_sequence, daemon=True).start()
 
     def win_game(self):
         def win_sequence():
             self.gma_client.send_message("/gma3/cmd", "Go sequence 105 cue 1")
-            self.trigger_reaper("/action/1016")
-            self.trigger_reaper("/marker/24")
-            self.trigger_reaper("/action/1007")
+            self.trigger_reaper_bundle("/action/1016", "/marker/24", "/action/1007")
             self.log_command("GAME    Win game sequence with lighting")
         threading.Thread(target=win_sequence, daemon=True).start()
 
     def static_and_flash(self):
         def static_flash_sequence():
             self.gma_client.send_message("/gma3/cmd", "Go sequence 104 cue 5.1")
-            self.trigger_reaper("/action/1016")
-            self.trigger_reaper("/marker/24")
-            self.trigger_reaper("/action/1007")
+            self.trigger_reaper_bundle("/action/1016", "/marker/24", "/action/1007")
             self.log_command("GAME    Static audio + light flash sequence")
         threading.Thread(target=static_flash_sequence, daemon=True).start()
 
@@ -483,9 +488,7 @@ class AVControlGUI:
 
     def reset_all(self):
         def reset_sequence():
-            self.trigger_reaper("/action/1016")
-            self.trigger_reaper("/marker/24")
-            self.trigger_reaper("/action/1007")
+            self.trigger_reaper_bundle("/action/1016", "/marker/24", "/action/1007")
             self.log_command("SYSTEM  Reset to base state")
         threading.Thread(target=reset_sequence, daemon=True).start()
 
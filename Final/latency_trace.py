@@ -0,0 +1,143 @@
+"""
+Press-to-output latency tracing.
+
+Every sensor press gets its own trace ID, unique within this run. Each stage it goes through records a
+span (start and end on time.perf_counter()) into a fixed-size ring buffer:
+
+  queue     datagram reached the socket (kernel timestamp, see
+            osc_ingest.py) -> game handler starts
+  handler   print_args() runs
+  led       datagram arrived -> the first strip.show() after its handler
+            asked for an LED change (none if it asked for none, or if
+            that frame showed no change: leds.stats()["unseen"])
+  osc       datagram arrived -> its GrandMA/REAPER cues handed to the network
+
+"led" and "osc" therefore read directly as press-to-light and
+press-to-sound on the game Pi. What happens before the datagram arrives is
+not traced: the sensor client polls every 0.1 s, so a press waits up to
+that long to be seen, and the network hop adds a little more. The buffer can be written out as a Chrome trace (chrome://tracing or
+https://ui.perfetto.dev; one row per press) or summarised per stage:
+
+    tracer = Tracer()
+    trace = tracer.begin(args, received, source)   # in the /print handler
+    ...
+    trace.end("handler")
+    leds.after_show(trace.closer("led"))
+    tracer.summary()                           # {"led": {"p50": ..., "p99": ...}, ...}
+    tracer.export_chrome("press_trace.json")
+
+    python3 latency_trace.py press_trace.json  # per-stage summary of a saved trace
+"""
+import sys
+import json
+import time
+import itertools
+import threading
+from collections import deque
+
+from percentiles import percentiles
+
+STAGES = ("queue", "handler", "led", "osc")
+
+
+class Trace:
+    """One press. Its spans go to the tracer's ring buffer as they finish."""
+
+    def __init__(self, tracer, trace_id, received, press=None):
+        self.tracer = tracer
+        self.id = trace_id
+        self.press = press  # what the sensor client called it, if it said
+        self.received = received
+        self.started = time.perf_counter()
+
+    def span(self, stage, start, end):
+        self.tracer._spans.append((self.id, stage, start, end, threading.current_thread().name, self.press))
+
+    def end(self, stage):
+        """Close the span from the handler starting to now."""
+        self.span(stage, self.started, time.perf_counter())
+
+    def closer(self, stage):
+        """A callback that records `stage` from the press arriving to when it is called."""
+        return lambda: self.span(stage, self.received, time.perf_counter())
+
+
+class Tracer:
+    def __init__(self, size=8192):
+        self._spans = deque(maxlen=size)  # (trace id, stage, start, end, thread, press); append is thread-safe
+        self._ids = itertools.count(1)
+        self.epoch = time.perf_counter()
+
+    def begin(self, args, received, source=None):
+        """
+        Start tracing a press that arrived at `received` (perf_counter) from
+        `source` (ip, port). The trace ID always comes from this tracer: the
+        press IDs sensor clients send ("Sensor 3 Pressed", press id) start
+        again at 1 on every run and overlap between clients, so they are only
+        kept as the "press" arg, next to the sender, to match a press up with
+        the client's log.
+        """
+        press = None
+        if len(args) >= 2 and isinstance(args[1], int):
+            press = {"id": args[1]}
+            if source is not None:
+                press["from"] = f"{source[0]}:{source[1]}"
+        trace = Trace(self, next(self._ids), received, press)
+        trace.span("queue", received, trace.started)
+        return trace
+
+    def spans(self):
+        return list(self._spans)
+
+    def summary(self):
+        """Per stage: count and p50/p95/p99/max duration in ms, over the spans in the buffer."""
+        by_stage = {}
+        for _, stage, start, end, _, _ in self.spans():
+            by_stage.setdefault(stage, []).append((end - start) * 1000)
+        return summarise(by_stage)
+
+    def chrome_trace(self):
+        events = []
+        for trace_id, stage, start, end, thread, press in self.spans():
+            args = {"trace": trace_id, "thread": thread}
+            if press is not None:
+                args["press"] = press
+            events.append({
+                "name": stage, "cat": "press", "ph": "X", "pid": 1, "tid": trace_id,
+                "ts": round((start - self.epoch) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "args": args,
+            })
+        events.sort(key=lambda e: e["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+def summarise(by_stage):
+    out = {}
+    for stage in sorted(by_stage, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+        ms = by_stage[stage]
+        out[stage] = {"count": len(ms), **percentiles(ms, digits=3), "max": round(max(ms), 3)}
+    return out
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python3 latency_trace.py press_trace.json", file=sys.stderr)
+        sys.exit(2)
+    with open(sys.argv[1]) as f:
+        events = json.load(f)["traceEvents"]
+    by_stage = {}
+    for e in events:
+        by_stage.setdefault(e["name"], []).append(e["dur"] / 1000)
+    for stage, s in summarise(by_stage).items():
+        print(f"{stage:8} n={s['count']:<6} p50 {s['p50']:8.3f} ms  p95 {s['p95']:8.3f} ms  "
+              f"p99 {s['p99']:8.3f} ms  max {s['max']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
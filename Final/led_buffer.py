@@ -0,0 +1,130 @@
+import ctypes
+import numpy as np
+
+# -------- Pixel framebuffer --------
+# Colours are packed the same way rpi_ws281x's Color() packs them:
+# 0xWWRRGGBB in a uint32. Effects draw into the buffer with whole-slice
+# operations and the LED engine copies it to the strip once per frame.
+# Every write widens a dirty span; the engine only pushes the part of that
+# span that really differs from what the strip is already showing.
+
+
+def split_rgb(color):
+    """Packed colour -> (r, g, b)."""
+    return (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+
+
+def gradient_colors(color_a, color_b, n):
+    """`n` packed colours blending linearly from color_a to color_b."""
+    t = np.linspace(0.0, 1.0, n)
+    a = np.array(split_rgb(color_a), dtype=np.float64)
+    b = np.array(split_rgb(color_b), dtype=np.float64)
+    rgb = (a + (b - a) * t[:, None] + 0.5).astype(np.uint32)
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+class FrameBuffer:
+    def __init__(self, count):
+        self.count = count
+        self.pixels = np.zeros(count, dtype=np.uint32)
+        self.writes = 0
+        self._lo, self._hi = count, 0
+
+    def __len__(self):
+        return self.count
+
+    def _span(self, start, stop):
+        stop = self.count if stop is None else min(stop, self.count)
+        start = max(0, start)
+        return start, max(start, stop)
+
+    # -------- Dirty tracking --------
+    def mark_dirty(self, start=0, stop=None):
+        """Call this after writing to `pixels` directly."""
+        start, stop = self._span(start, stop)
+        if start < stop:
+            self.writes += 1
+            self._lo = min(self._lo, start)
+            self._hi = max(self._hi, stop)
+
+    def take_dirty(self):
+        """Return the (start, stop) touched since the last call, or None."""
+        if self._lo >= self._hi:
+            return None
+        span = (self._lo, self._hi)
+        self._lo, self._hi = self.count, 0
+        return span
+
+    # -------- Drawing --------
+    def set(self, i, color):
+        if 0 <= i < self.count:
+            self.pixels[i] = color
+            self.mark_dirty(i, i + 1)
+
+    def fill(self, color, start=0, stop=None):
+        start, stop = self._span(start, stop)
+        self.pixels[start:stop] = color
+        self.mark_dirty(start, stop)
+
+    def clear(self, start=0, stop=None):
+        self.fill(0, start, stop)
+
+    def gradient(self, start, stop, color_a, color_b):
+        """Linear blend from color_a at `start` to color_b at `stop - 1`."""
+        start, stop = self._span(start, stop)
+        if stop <= start:
+            return
+        self.pixels[start:stop] = gradient_colors(color_a, color_b, stop - start)
+        self.mark_dirty(start, stop)
+
+    def blit(self, colors, start=0):
+        """Copy a sequence/array of packed colours in at `start`."""
+        colors = np.asarray(colors, dtype=np.uint32)
+        start, stop = self._span(start, start + len(colors))
+        self.pixels[start:stop] = colors[:stop - start]
+        self.mark_dirty(start, stop)
+
+
+# -------- Pushing to the strip --------
+class StripWriter:
+    """
+    Copies a FrameBuffer into the strip's own LED array in one go.
+    On the Pi that is a single memmove into the ws2811 channel buffer;
+    anything else falls back to slice assignment or setPixelColor. A strip
+    with its own copy_pixels() (a MultiStrip) does the copying itself.
+    """
+
+    def __init__(self, strip):
+        self.strip = strip
+        self._copy = None
+
+    def _pick(self):
+        strip = self.strip
+        if hasattr(strip, "copy_pixels"):  # led_segments.MultiStrip
+            return strip.copy_pixels
+        try:
+            from rpi_ws281x import ws
+            address = int(ws.ws2811_channel_t_leds_get(strip._channel))
+            if address:
+                def copy(pixels, start, stop):
+                    src = pixels[start:stop]
+                    ctypes.memmove(address + start * 4, src.ctypes.data, src.nbytes)
+                return copy
+        except Exception:
+            pass
+
+        if hasattr(strip, "_led_data"):
+            def copy(pixels, start, stop):
+                strip._led_data[start:stop] = pixels[start:stop].tolist()
+            return copy
+
+        def copy(pixels, start, stop):
+            for i, c in enumerate(pixels[start:stop].tolist(), start):
+                strip.setPixelColor(i, c)
+        return copy
+
+    def write(self, pixels, start=0, stop=None):
+        """Copy `pixels[start:stop]` (a uint32 array) to the strip."""
+        if self._copy is None:
+            self._copy = self._pick()
+        self._copy(pixels, start, len(pixels) if stop is None else stop)
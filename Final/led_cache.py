@@ -0,0 +1,227 @@
+import os
+import zlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from led_buffer import FrameBuffer
+
+# -------- Pre-rendered effect frames --------
+# Deterministic effects (level start, red/green sweeps, BPM flash) only depend
+# on their arguments and the strip length, so they are rendered once into a
+# FrameSequence and replayed from memory. With `path` set, sequences are also
+# written to .npy files and loaded back memory-mapped after a restart.
+
+
+class FrameSequence:
+    """`frames[i]` is shown for `holds[i]` seconds."""
+
+    def __init__(self, frames, holds):
+        self.frames = frames
+        self.holds = holds
+
+    def __len__(self):
+        return len(self.holds)
+
+    @property
+    def duration(self):
+        return float(np.sum(self.holds))
+
+    @property
+    def nbytes(self):
+        return self.frames.nbytes + self.holds.nbytes
+
+
+def render(effect, count, fps, *args):
+    """
+    Run `effect(fb, *args)` against a scratch buffer with the same frame
+    timing as the LED engine and keep one copy of each distinct frame.
+    """
+    fb = FrameBuffer(count)
+    period = 1.0 / fps
+    frames_out = effect(fb, *args)
+    frames, holds = [], []
+    tick, due, done = 0, 0.0, False
+    while True:
+        now = tick * period
+        while due <= now:
+            try:
+                hold = next(frames_out)
+            except StopIteration:
+                done = True
+                break
+            due += period if hold is None else hold
+        # The engine starts the next effect in the same tick this one ends,
+        # so the final picture gets no hold of its own.
+        step = 0.0 if done else period
+        if frames and np.array_equal(frames[-1], fb.pixels):
+            holds[-1] += step
+        else:
+            frames.append(fb.pixels.copy())
+            holds.append(step)
+        if done:
+            break
+        tick += 1
+    return FrameSequence(np.array(frames, dtype=np.uint32).reshape(len(frames), count),
+                         np.array(holds, dtype=np.float64))
+
+
+def play(fb, seq):
+    """Effect generator that replays a FrameSequence into `fb`."""
+    for frame, hold in zip(seq.frames, seq.holds):
+        fb.blit(frame)
+        yield float(hold)
+
+
+_code_crcs = {}
+_PLAIN = (int, float, complex, str, bytes, bool, type(None))
+
+
+def _value_bytes(value):
+    """A stable byte form of a constant, default or module-level setting (None if it has none)."""
+    if isinstance(value, _PLAIN):
+        return repr(value).encode()
+    if isinstance(value, (tuple, list)):
+        parts = [_value_bytes(v) for v in value]
+        return None if None in parts else b"(" + b",".join(parts) + b")"
+    if isinstance(value, (set, frozenset)):
+        parts = [_value_bytes(v) for v in value]
+        return None if None in parts else b"{" + b",".join(sorted(parts)) + b"}"
+    if isinstance(value, dict):
+        parts = [_value_bytes(item) for item in value.items()]
+        return None if None in parts else b"{" + b",".join(sorted(parts)) + b"}"
+    return None
+
+
+def _code_bytes(code):
+    """Bytecode and constants of `code` and of the code nested in it (inner generators, lambdas)."""
+    out = [code.co_code]
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            out += _code_bytes(const)
+        else:
+            out.append(_value_bytes(const) or type(const).__name__.encode())
+    return out
+
+
+def _names(code):
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            names += _names(const)
+    return names
+
+
+def _code_crc(func, seen=None):
+    """
+    crc32 of everything `func` renders from: its bytecode and constants (colours,
+    hold times), its default arguments, the module-level values it reads
+    (e.g. STEP) and, the same way, the module-level functions it calls
+    (e.g. chase()).
+    """
+    top = seen is None
+    if top and func in _code_crcs:
+        return _code_crcs[func]
+    seen = set() if top else seen
+    seen.add(func)
+    code = func.__code__
+    crc = 0
+    for part in _code_bytes(code):
+        crc = zlib.crc32(part, crc)
+    crc = zlib.crc32(_value_bytes(func.__defaults__) or b"", crc)
+    kwdefaults = func.__kwdefaults__ or {}
+    crc = zlib.crc32(_value_bytes(kwdefaults) or b"", crc)
+    for value in list(kwdefaults.values()) + list(func.__defaults__ or ()):
+        if hasattr(value, "__code__") and value not in seen:
+            crc = zlib.crc32(_code_crc(value, seen).to_bytes(4, "little"), crc)
+    for name in _names(code):
+        other = func.__globals__.get(name)
+        if hasattr(other, "__code__"):
+            if other not in seen:
+                crc = zlib.crc32(_code_crc(other, seen).to_bytes(4, "little"), crc)
+        else:
+            value = _value_bytes(other)
+            if value is not None:
+                crc = zlib.crc32(name.encode() + b"=" + value, crc)
+    if top:
+        _code_crcs[func] = crc
+    return crc
+
+
+class EffectCache:
+    def __init__(self, count, fps, capacity=32, path=None):
+        self.count = count
+        self.fps = fps
+        self.capacity = capacity
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._seqs = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def _key(self, effect, args):
+        # The code hash (bytecode, constants, defaults and the globals read)
+        # means editing an effect never replays stale frames.
+        code = _code_crc(effect)
+        parts = [effect.__name__] + [str(a) for a in args]
+        parts += [f"{self.count}px", f"{self.fps}fps", f"{code:08x}"]
+        return "-".join(parts).replace("/", "_").replace(" ", "")
+
+    def _load(self, key):
+        base = os.path.join(self.path, key)
+        try:
+            frames = np.load(base + ".frames.npy", mmap_mode="r")
+            holds = np.load(base + ".holds.npy")
+        except (OSError, ValueError):
+            return None
+        return FrameSequence(frames, holds)
+
+    def _save(self, key, seq):
+        base = os.path.join(self.path, key)
+        try:
+            np.save(base + ".frames.npy", seq.frames)
+            np.save(base + ".holds.npy", seq.holds)
+        except OSError as e:
+            print(f"Effect cache write failed: {e}")
+
+    def get(self, effect, *args):
+        key = self._key(effect, args)
+        with self._lock:
+            seq = self._seqs.get(key)
+            if seq is not None:
+                self._seqs.move_to_end(key)
+                self.hits += 1
+                return seq
+            self.misses += 1
+
+        seq = self._load(key) if self.path else None
+        if seq is not None:
+            self.disk_hits += 1
+        else:
+            seq = render(effect, self.count, self.fps, *args)
+            if self.path:
+                self._save(key, seq)
+
+        with self._lock:
+            self._seqs[key] = seq
+            self._seqs.move_to_end(key)
+            while len(self._seqs) > self.capacity:
+                self._seqs.popitem(last=False)
+                self.evictions += 1
+        return seq
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._seqs),
+                "bytes": sum(s.nbytes for s in self._seqs.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,51 @@
+import numpy as np
+
+# -------- Output colour pipeline --------
+# Effects work in plain linear 0-255 RGB (so a fade is just a straight line
+# between two colours). Right before a frame goes to the strip, each channel
+# is looked up in a 256-entry table that already has gamma, white balance and
+# global brightness baked in and is shifted into the strip's byte order. A
+# whole frame is converted with three table lookups and two ORs in NumPy.
+#
+# Byte order: rpi_ws281x already reorders RGB -> GRB for the default
+# strip_type, so leave `order` at "RGB" there. Use order="GRB" together with
+# strip_type=WS2811_STRIP_RGB to do the reordering here instead.
+
+DEFAULT_GAMMA = 2.2
+
+
+class ColorPipeline:
+    def __init__(self, gamma=DEFAULT_GAMMA, white=(1.0, 1.0, 1.0), brightness=255, order="RGB"):
+        order = order.upper()
+        if sorted(order) != sorted("RGB"):
+            raise ValueError(f"order must be a permutation of RGB, not {order!r}")
+        self.gamma = gamma
+        self.white = tuple(white)        # per-channel scale, 0.0 - 1.0
+        self.brightness = brightness     # 0 - 255, like Adafruit_NeoPixel's
+        self.order = order
+        self.luts = self._build()
+
+    def _build(self):
+        """One uint32 table per input channel (R, G, B), values pre-shifted."""
+        level = np.arange(256, dtype=np.float64) / 255.0
+        curve = level ** self.gamma * (self.brightness / 255.0)
+        luts = []
+        for channel, scale in zip("RGB", self.white):
+            shift = 8 * (2 - self.order.index(channel))
+            values = np.clip(np.rint(curve * scale * 255.0), 0, 255).astype(np.uint32)
+            luts.append(values << shift)
+        return luts
+
+    def apply(self, pixels, out=None):
+        """Linear 0xRRGGBB pixels -> strip-ready words, in `out` if given."""
+        lut_r, lut_g, lut_b = self.luts
+        if out is None:
+            out = np.empty(len(pixels), dtype=np.uint32)
+        np.take(lut_r, (pixels >> 16) & 0xFF, out=out)
+        out |= lut_g[(pixels >> 8) & 0xFF]
+        out |= lut_b[pixels & 0xFF]
+        return out
+
+    def __call__(self, color):
+        """Correct a single packed colour (handy for the simulator/debugging)."""
+        return int(self.apply(np.array([color], dtype=np.uint32))[0])
@@ -0,0 +1,101 @@
+import numpy as np
+
+from led_buffer import FrameBuffer
+
+# -------- Layered compositor --------
+# Each layer is its own FrameBuffer that one effect at a time draws into.
+# Once per frame the layers are combined bottom to top with whole-array
+# NumPy operations and the result lands in the engine's output buffer.
+#
+# Black (0) means "transparent" in a layer, so a flash that turns off shows
+# the progress bar underneath instead of blanking it. An effect that must
+# own the whole strip (a win or fail animation) therefore only goes dark if
+# the layers below it are cleared too, e.g. progress_bar.reset().
+# `alpha` (0.0 - 1.0) scales how strongly a layer covers what is below it.
+
+NORMAL   = "normal"    # replace what is below
+ADD      = "add"       # brighten (clipped at 255)
+SCREEN   = "screen"    # brighten, softer than add
+MULTIPLY = "multiply"  # tint / darken
+
+DEFAULT_LAYERS = (
+    ("background", NORMAL, 1.0),
+    ("progress",   NORMAL, 1.0),
+    ("overlay",    NORMAL, 1.0),
+    ("alert",      NORMAL, 1.0),
+)
+
+
+def unpack(pixels):
+    """uint32 0xRRGGBB array -> float32 (n, 3) array."""
+    rgb = np.empty((len(pixels), 3), dtype=np.float32)
+    rgb[:, 0] = (pixels >> 16) & 0xFF
+    rgb[:, 1] = (pixels >> 8) & 0xFF
+    rgb[:, 2] = pixels & 0xFF
+    return rgb
+
+
+def pack(rgb):
+    """float (n, 3) array -> uint32 0xRRGGBB array."""
+    c = np.clip(rgb + 0.5, 0, 255).astype(np.uint32)
+    return (c[:, 0] << 16) | (c[:, 1] << 8) | c[:, 2]
+
+
+class Layer:
+    def __init__(self, name, count, blend=NORMAL, alpha=1.0):
+        self.name = name
+        self.fb = FrameBuffer(count)
+        self.blend = blend
+        self.alpha = alpha
+
+
+class Compositor:
+    def __init__(self, count, layers=DEFAULT_LAYERS):
+        self.count = count
+        self.layers = [Layer(name, count, blend, alpha) for name, blend, alpha in layers]
+        self.by_name = {layer.name: layer for layer in self.layers}
+        self.composites = 0
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def set_layer(self, name, blend=None, alpha=None):
+        layer = self.by_name[name]
+        if blend is not None:
+            layer.blend = blend
+        if alpha is not None:
+            layer.alpha = max(0.0, min(1.0, alpha))
+        layer.fb.mark_dirty()  # recomposite on the next frame
+
+    def compose(self, out):
+        """Blend every layer into `out` if any of them changed. Returns True if it did."""
+        dirty = False
+        for layer in self.layers:
+            if layer.fb.take_dirty() is not None:
+                dirty = True
+        if not dirty:
+            return False
+
+        base = np.zeros((self.count, 3), dtype=np.float32)
+        for layer in self.layers:
+            pixels = layer.fb.pixels
+            covered = pixels != 0
+            if layer.alpha <= 0 or not covered.any():
+                continue
+            top = unpack(pixels)
+            if layer.blend == ADD:
+                mixed = np.minimum(base + top, 255)
+            elif layer.blend == SCREEN:
+                mixed = 255 - (255 - base) * (255 - top) / 255
+            elif layer.blend == MULTIPLY:
+                mixed = base * top / 255
+            else:
+                mixed = top
+            if layer.alpha < 1:
+                mixed = base + (mixed - base) * layer.alpha
+            base = np.where(covered[:, None], mixed, base)
+
+        out.pixels[:] = pack(base)
+        out.mark_dirty()
+        self.composites += 1
+        return True
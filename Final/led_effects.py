@@ -0,0 +1,71 @@
+try:
+    from rpi_ws281x import Color
+except ImportError:  # not on the Pi
+    from neopixel_sim import Color
+
+from led_buffer import gradient_colors
+
+# -------- Lighting Effect Functions --------
+# Effects are generators handed to LedEngine.submit() (see led_engine.py).
+# They draw into a frame buffer `fb` and `yield <seconds>` takes the place of
+# strip.show() + time.sleep(<seconds>), so callers never block.
+
+STEP = 1 / 60  # seconds per frame, for effects that animate every frame
+
+def light_up(fb, n, color):
+    fb.fill(color, 0, n)
+
+def fill(fb, n, color):
+    light_up(fb, n, color)
+    yield
+
+def flash(fb, n, color, hold):
+    light_up(fb, n, color)
+    yield hold
+    light_up(fb, n, 0)
+
+def chase(fb, n, color, duration=1.5, direction=-1, tail=1, fade_to=0):
+    """
+    A lit head runs the length of the first `n` LEDs in `duration` seconds,
+    whatever `n` is. direction=-1 runs from the far end down to pixel 0.
+    The `tail` pixels behind the head ramp from `color` to `fade_to`.
+    Drawn once per frame: each frame moves the whole head/tail at once.
+    """
+    ramp = gradient_colors(color, fade_to, tail)
+    if direction > 0:
+        ramp = ramp[::-1]  # tail below the head
+    frames = max(1, int(round(duration / STEP)))
+    lo = hi = 0
+    for f in range(frames):
+        p = f * n // frames
+        head = n - 1 - p if direction < 0 else p
+        fb.clear(lo, hi)
+        lo = head if direction < 0 else head - tail + 1
+        hi = lo + tail
+        skip = max(0, -lo)
+        lo, hi = lo + skip, min(hi, n)
+        fb.blit(ramp[skip:skip + hi - lo], lo)
+        yield STEP
+    fb.clear(lo, hi)
+
+def red_dim(fb, n):
+    yield from chase(fb, n, Color(255, 0, 0))
+    for _ in range(5):
+        light_up(fb, n, Color(255, 0, 0))
+        yield 0.3
+        light_up(fb, n, 0)
+        yield 0.3
+    light_up(fb, n, 0)
+
+def green_dim(fb, n):
+    yield from chase(fb, n, Color(0, 255, 0))
+
+def flash_bpm(fb, n, bpm=120, duration=5):
+    delay = 60 / bpm / 2
+    for _ in range(int(duration / (delay * 2))):
+        light_up(fb, n, Color(0, 255, 0))
+        yield delay
+        light_up(fb, n, 0)
+        yield delay
+
+# Stage start sequences are data now: see LEVEL_START_SHOWS in led_shows.py.
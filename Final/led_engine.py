@@ -0,0 +1,393 @@
+import time
+import heapq
+import itertools
+import threading
+
+import numpy as np
+
+from led_buffer import FrameBuffer, StripWriter
+from led_compositor import Compositor
+from led_record import FrameRecorder
+
+# -------- Frame-based LED render engine --------
+# One background thread owns the NeoPixel strip and pushes at most one frame
+# per tick. Effects are generators: they draw into `engine.fb` (a FrameBuffer,
+# see led_buffer.py), then `yield` how long (in seconds) the current picture
+# should stay up. `yield` on its own means "hold for one frame". Short holds
+# inside the same frame are coalesced, so an effect written with
+# `time.sleep(0.005)` style steps still only costs one strip.show() per frame,
+# and a frame that ends up identical to the last one pushed costs none.
+#
+# Every job has a priority. Higher priority jobs run first and cut off a
+# lower priority job that is already playing; equal priorities queue up in
+# submission order. Cancelling (or preempting) takes effect on the next tick.
+#
+# With `layers` (see led_compositor.py) every layer gets its own queue, so a
+# flash on "overlay" plays at the same time as the bar on "progress"; the
+# layers are blended into `engine.fb` once per frame. Priorities and
+# preemption apply within a layer. Without layers there is a single queue
+# drawing straight into `engine.fb`, and `layer=` arguments are ignored.
+#
+# With `color` (a ColorPipeline, see led_color.py) effects stay in linear RGB
+# and only the changed span of each frame is gamma/brightness corrected on
+# its way to the strip.
+#
+# start_recording() logs every pushed frame to a file that led_record.py
+# can inspect or play back.
+#
+# after_show(callback) calls callback() on the render thread right after the
+# next strip.show(), i.e. once everything asked for so far is on the LEDs;
+# `requests` counts submit() and touch() calls (touch() notes a change made
+# to an effect that is already running, such as ProgressBar.advance()) so a
+# caller can tell whether it asked for anything. The latency trace uses both to time press -> light.
+#
+# `clock` is anything with monotonic() and sleep() (the time module by
+# default); the benchmarks pass a virtual clock so nothing really waits.
+
+DEFAULT_FPS = 60
+
+PRIORITY_PROGRESS = 0   # milestone progress bar
+PRIORITY_EFFECT   = 10  # stage start / win / fail animations
+PRIORITY_ALERT    = 20  # game over
+
+
+class LedJob:
+    """A submitted effect. Use wait() if you really need to block on it."""
+
+    def __init__(self, frames, priority=PRIORITY_EFFECT, on_done=None):
+        self.frames = frames
+        self.priority = priority
+        self.on_done = on_done
+        self.due = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+def _clear(fb):
+    fb.clear()
+    yield
+
+
+class _Lane:
+    """A queue of effects drawing into one buffer, one effect at a time."""
+
+    def __init__(self, fb):
+        self.fb = fb
+        self.queue = []  # heap of (-priority, order, job)
+        self.current = None
+
+
+class LedEngine:
+    def __init__(self, strip, fps=DEFAULT_FPS, clock=time, layers=None, color=None):
+        self.strip = strip
+        self.clock = clock
+        self.fb = FrameBuffer(strip.numPixels())
+        self._writer = StripWriter(strip)
+        self.fps = fps
+        self.period = 1.0 / fps
+        self._shown = self.fb.pixels.copy()  # what the strip is displaying
+        self.color = color
+        self._out = self.fb.pixels.copy()    # corrected words when `color` is set
+        self.recorder = None
+        self.frames_shown = 0    # strip.show() calls made
+        self.frames_skipped = 0  # frames whose writes changed nothing
+        self.pixels_pushed = 0
+        self.preempted = 0
+        self.requests = 0        # submit() and touch() calls
+        self._after_show = []    # callbacks for the next strip.show()
+        self.unseen = 0          # after_show() callbacks dropped: their frame changed nothing
+
+        if layers:
+            self.compositor = Compositor(len(self.fb), layers)
+            self._lanes = {layer.name: _Lane(layer.fb) for layer in self.compositor.layers}
+            self._default_lane = "overlay" if "overlay" in self._lanes else self.compositor.layers[-1].name
+        else:
+            self.compositor = None
+            self._lanes = {"main": _Lane(self.fb)}
+            self._default_lane = "main"
+        self._lane_list = list(self._lanes.values())
+        self._live = False  # some lane had an effect playing after the last step
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    # -------- Public API --------
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="led-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.stop_recording()
+
+    def start_recording(self, path):
+        """Log every frame pushed from now on to `path` (see led_record.py)."""
+        recorder = FrameRecorder(path, len(self.fb), self.fps, self.clock)
+        old, self.recorder = self.recorder, recorder
+        if old is not None:
+            old.close()
+        return recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+        return recorder
+
+    def _lane(self, layer):
+        if self.compositor is None or layer is None:
+            return self._lanes[self._default_lane]
+        return self._lanes[layer]
+
+    def layer(self, name=None):
+        """The FrameBuffer effects on layer `name` should draw into."""
+        return self._lane(name).fb
+
+    def submit(self, frames, priority=PRIORITY_EFFECT, on_done=None, layer=None):
+        """
+        Queue an effect generator and return its LedJob straight away.
+        `on_done` is called from the render thread only if the effect
+        runs to the end (not when it is cancelled or preempted).
+        """
+        job = LedJob(frames, priority, on_done)
+        lane = self._lane(layer)
+        with self._cond:
+            heapq.heappush(lane.queue, (-priority, next(self._order), job))
+            current = lane.current
+            if current is not None and priority > current.priority and not current.cancelled:
+                current.cancel()
+                self.preempted += 1
+            self.requests += 1
+            self._cond.notify()
+        return job
+
+    def touch(self):
+        """Note a change handed to an effect that is already running."""
+        with self._cond:
+            self.requests += 1
+
+    def after_show(self, callback):
+        """
+        Call `callback()` on the render thread after the next frame's
+        strip.show(). If that frame shows no change the callback is dropped
+        (and counted in stats()["unseen"]) rather than handed a later,
+        unrelated frame.
+        """
+        with self._cond:
+            self._after_show.append(callback)
+
+    def cancel_all(self, below=None, layer=None):
+        """
+        Cancel running and queued effects: only those with priority < `below`
+        and only on `layer` when given.
+        """
+        with self._cond:
+            lanes = self._lanes.values() if layer is None else [self._lane(layer)]
+            for lane in lanes:
+                jobs = [entry[2] for entry in lane.queue]
+                if lane.current is not None:
+                    jobs.append(lane.current)
+                for job in jobs:
+                    if below is None or job.priority < below:
+                        job.cancel()
+            self._cond.notify()
+
+    def blank(self):
+        """Queue a clear of every layer (e.g. after cancel_all())."""
+        for name, lane in self._lanes.items():
+            self.submit(_clear(lane.fb), PRIORITY_ALERT, layer=name)
+
+    def stats(self):
+        writes = sum(lane.fb.writes for lane in self._lanes.values())
+        stats = {
+            "frames_shown": self.frames_shown,
+            "frames_skipped": self.frames_skipped,
+            "writes": writes,
+            "writes_coalesced": max(0, writes - self.frames_shown),
+            "pixels_pushed": self.pixels_pushed,
+            "preempted": self.preempted,
+            "unseen": self.unseen,
+        }
+        if self.compositor is not None:
+            stats["composites"] = self.compositor.composites
+        if self.recorder is not None:
+            stats["recording"] = self.recorder.stats()
+        return stats
+
+    def idle(self):
+        with self._cond:
+            return not self._busy()
+
+    def run_until_idle(self):
+        """
+        Play everything queued on the calling thread, then return.
+        For offline runs and benchmarks; don't mix with start().
+        """
+        next_tick = self.clock.monotonic()
+        with self._cond:
+            self._start_lanes(next_tick)
+        self._live = self._active()
+        while self._live:
+            next_tick = self._tick(self.clock.monotonic(), next_tick)
+
+    # -------- Render loop --------
+    def _busy(self):
+        return any(lane.current is not None or lane.queue for lane in self._lanes.values())
+
+    def _active(self):
+        for lane in self._lane_list:
+            if lane.current is not None:
+                return True
+        return False
+
+    def _pop(self, lane):
+        """Next job to run on `lane`, dropping cancelled ones. Call with the lock held."""
+        while lane.queue:
+            job = heapq.heappop(lane.queue)[2]
+            if not job.cancelled:
+                return job
+            job.done.set()
+        return None
+
+    def _start_lanes(self, now):
+        """Give every idle lane its next job. Call with the lock held."""
+        for lane in self._lanes.values():
+            if lane.current is None and lane.queue:
+                lane.current = self._pop(lane)
+                if lane.current is not None:
+                    lane.current.due = now
+
+    def _wait_for_work(self):
+        with self._cond:
+            while self._running and not self._busy():
+                self._cond.wait()
+            return self._running
+
+    def _finish(self, lane, job, now):
+        """Retire `job`, start the lane's next one at `now` and return it (or None)."""
+        if job.on_done is not None and not job.cancelled:
+            try:
+                job.on_done()
+            except Exception as e:
+                print(f"LED on_done error: {e}")
+        job.done.set()
+        with self._cond:
+            nxt = lane.current = self._pop(lane)
+        if nxt is not None:
+            nxt.due = now
+        return nxt
+
+    def _step_lane(self, lane, now):
+        changed = False
+        job = lane.current
+        while job is not None:
+            if job.cancelled:
+                job = self._finish(lane, job, now)
+                continue
+            if job.due > now:
+                break
+            try:
+                hold = next(job.frames)
+            except StopIteration:
+                changed = True
+                job = self._finish(lane, job, now)
+                continue
+            except Exception as e:
+                print(f"LED effect error: {e}")
+                job.cancel()
+                continue
+            job.due += self.period if hold is None else hold
+            changed = True
+        return changed
+
+    def _step(self, now):
+        """Advance every running effect up to `now`. Returns True if any of them ran."""
+        changed = live = False
+        for lane in self._lane_list:
+            job = lane.current
+            if job is None:
+                if not lane.queue:
+                    continue
+                with self._cond:
+                    self._start_lanes(now)
+            elif job.due > now and not job.cancelled:
+                live = True
+                continue  # still holding its current picture
+            if self._step_lane(lane, now):
+                changed = True
+            if lane.current is not None:
+                live = True
+        self._live = live
+        return changed
+
+    def _push(self):
+        """Send the frame to the strip if it changed. Returns True if strip.show() ran."""
+        if self.compositor is not None:
+            self.compositor.compose(self.fb)
+        span = self.fb.take_dirty()
+        if span is not None:
+            lo, hi = span
+            diff = np.flatnonzero(self.fb.pixels[lo:hi] != self._shown[lo:hi])
+            if diff.size:
+                lo, hi = lo + int(diff[0]), lo + int(diff[-1]) + 1
+                self._shown[lo:hi] = self.fb.pixels[lo:hi]
+                if self.color is not None:
+                    out = self._out
+                    self.color.apply(self._shown[lo:hi], out=out[lo:hi])
+                else:
+                    out = self._shown
+                self._writer.write(out, lo, hi)
+                self.strip.show()
+                recorder = self.recorder
+                if recorder is not None:
+                    recorder.frame(out, lo, hi)
+                self.frames_shown += 1
+                self.pixels_pushed += hi - lo
+                return True
+        self.frames_skipped += 1
+        return False
+
+    def _tick(self, now, next_tick):
+        """Render one frame at `now`, sleep until the next one and return its time."""
+        waiting = self._after_show
+        if waiting:
+            with self._cond:
+                waiting, self._after_show = self._after_show, []
+        if self._step(now) and self._push():
+            for callback in waiting:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"LED after_show error: {e}")
+        elif waiting:
+            self.unseen += len(waiting)  # the change asked for showed nothing
+
+        next_tick += self.period
+        delay = next_tick - self.clock.monotonic()
+        if delay > 0:
+            self.clock.sleep(delay)
+            return next_tick
+        return self.clock.monotonic()  # running late: don't try to catch up
+
+    def _run(self):
+        next_tick = self.clock.monotonic()
+        while self._running:
+            if not self._live:
+                if not self._wait_for_work():
+                    break
+                next_tick = self.clock.monotonic()
+            next_tick = self._tick(self.clock.monotonic(), next_tick)
@@ -0,0 +1,78 @@
+import math
+import threading
+
+from led_engine import PRIORITY_PROGRESS
+
+# -------- Incremental progress bar --------
+# A press only moves the bar's target; the drawing happens on the render
+# thread. Each frame the bar grows part of the way to its target (ease-out)
+# and only the newly lit span is written, so a burst of presses costs one
+# frame's worth of work instead of one full redraw per press. With a layered
+# engine the bar lives on the "progress" layer, under any flashes.
+
+
+class ProgressBar:
+    def __init__(self, engine, color=0, ease=0.25, layer="progress"):
+        self.engine = engine
+        self.layer = layer
+        self.fb = engine.layer(layer)
+        self.color = color
+        self.ease = ease      # fraction of the remaining gap covered per frame
+        self.lit = 0          # pixels currently drawn
+        self.target = 0
+        self._job = None
+        self._generation = 0  # bumped by reset(); older _frames() generators stop drawing
+        self._lock = threading.Lock()
+
+    def advance(self, n, color=None):
+        """Move the bar to `n` lit pixels. Safe to call from any thread."""
+        with self._lock:
+            if color is not None:
+                self.color = color
+            self.target = max(0, min(n, len(self.fb)))
+            job = self._job
+            if job is None or job.done.is_set():
+                if job is not None and job.cancelled:
+                    self.lit = 0  # something else drew over us: grow again from 0
+                self._job = self.engine.submit(self._frames(self._generation), PRIORITY_PROGRESS,
+                                               layer=self.layer)
+            else:
+                self.engine.touch()  # the running job picks up the new target
+
+    def reset(self, color=None):
+        """Empty the bar."""
+        with self._lock:
+            if self._job is not None:
+                self._job.cancel()
+                self._job = None
+            if color is not None:
+                self.color = color
+            self._generation += 1
+            self.lit = self.target = 0
+            self.engine.submit(self._clear(), PRIORITY_PROGRESS, layer=self.layer)
+
+    def _clear(self):
+        self.fb.clear()
+        yield
+
+    def _frames(self, generation):
+        # Each step reads and moves `lit` under the lock, so a reset() from
+        # another thread can't be overwritten by a step already under way; a
+        # generator from before the reset just stops.
+        while True:
+            with self._lock:
+                if generation != self._generation:
+                    return
+                if self.lit == self.target:
+                    self._job = None  # the next advance() starts a new job
+                    return
+                gap = self.target - self.lit
+                step = max(1, int(math.ceil(abs(gap) * self.ease)))
+                if gap > 0:
+                    new = min(self.target, self.lit + step)
+                    self.fb.fill(self.color, self.lit, new)
+                else:
+                    new = max(self.target, self.lit - step)
+                    self.fb.clear(new, self.lit)
+                self.lit = new
+            yield
@@ -0,0 +1,169 @@
+"""
+LED frame recording and replay.
+
+The LED engine can log every frame it pushes (see LedEngine.start_recording)
+to a compact binary file. This module writes and reads that file and plays
+it back to a strip, real or simulated, at 1x or faster.
+
+    python3 led_record.py info show.ledrec
+    python3 led_record.py replay show.ledrec --speed 4
+"""
+import sys
+import time
+import zlib
+import struct
+import threading
+import argparse
+import statistics
+
+import numpy as np
+
+from led_buffer import StripWriter
+
+# -------- File format --------
+# Header:  magic, pixel count, nominal fps
+# Frame:   time since recording start (us), first pixel, end pixel, payload size,
+#          then zlib(pixels[lo:hi] XOR previous frame[lo:hi])
+# Only the span the engine pushed is stored and it is XORed against the frame
+# before it, so unchanged pixels become zeros and compress to almost nothing.
+# The first frame always covers the whole strip so playback can start cold.
+# Pixels are stored exactly as they were sent to the strip (after the colour
+# pipeline, if any), so a replay needs no further processing.
+
+MAGIC = b"LEDREC01"
+HEADER = struct.Struct("<8sIf")
+FRAME = struct.Struct("<QHHI")
+
+
+class FrameRecorder:
+    def __init__(self, path, count, fps, clock=time):
+        self.path = path
+        self.count = count
+        self.clock = clock
+        self.frames = 0
+        self.bytes = HEADER.size
+        self._prev = np.zeros(count, dtype=np.uint32)
+        self._start = None
+        self._lock = threading.Lock()  # close() may come from another thread
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, count, fps))
+
+    def frame(self, pixels, lo, hi):
+        """Log `pixels[lo:hi]` as shown now. `pixels` is the whole displayed strip."""
+        now = self.clock.monotonic()
+        if self._start is None:
+            self._start = now
+            lo, hi = 0, self.count
+        delta = pixels[lo:hi] ^ self._prev[lo:hi]
+        self._prev[lo:hi] = pixels[lo:hi]
+        payload = zlib.compress(delta.astype("<u4").tobytes(), 1)
+        t_us = int(round((now - self._start) * 1e6))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(FRAME.pack(t_us, lo, hi, len(payload)))
+            self._file.write(payload)
+        self.frames += 1
+        self.bytes += FRAME.size + len(payload)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def stats(self):
+        raw = self.frames * self.count * 4
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "ratio": round(raw / self.bytes, 1) if self.frames else 0.0,
+        }
+
+
+def read_frames(path):
+    """Yield (seconds, pixels) for every frame in a recording; `pixels` is the whole strip."""
+    with open(path, "rb") as f:
+        magic, count, fps = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an LED recording")
+        pixels = np.zeros(count, dtype=np.uint32)
+        while True:
+            head = f.read(FRAME.size)
+            if len(head) < FRAME.size:
+                return
+            t_us, lo, hi, size = FRAME.unpack(head)
+            delta = np.frombuffer(zlib.decompress(f.read(size)), dtype="<u4")
+            pixels[lo:hi] ^= delta
+            yield t_us / 1e6, pixels
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, count, fps = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an LED recording")
+    return count, fps
+
+
+def replay(path, strip, speed=1.0, clock=time):
+    """
+    Push a recording to `strip` with its original timing divided by `speed`.
+    Blocks until done and returns the worst lateness seen, in seconds.
+    Don't run it while an LedEngine owns the same strip.
+    """
+    writer = StripWriter(strip)
+    start = clock.monotonic()
+    late = 0.0
+    for t, pixels in read_frames(path):
+        delay = start + t / speed - clock.monotonic()
+        if delay > 0:
+            clock.sleep(delay)
+        else:
+            late = max(late, -delay)
+        writer.write(pixels)
+        strip.show()
+    return late
+
+
+def summary(path):
+    """Frame count, duration and frame-to-frame timing of a recording."""
+    count, fps = read_header(path)
+    stamps = [t for t, _ in read_frames(path)]
+    gaps_ms = [(b - a) * 1000 for a, b in zip(stamps, stamps[1:])]
+    return {
+        "leds": count,
+        "fps": fps,
+        "frames": len(stamps),
+        "duration_s": round(stamps[-1], 4) if stamps else 0.0,
+        "gap_ms": {
+            "min": round(min(gaps_ms), 3) if gaps_ms else 0.0,
+            "mean": round(statistics.mean(gaps_ms), 3) if gaps_ms else 0.0,
+            "max": round(max(gaps_ms), 3) if gaps_ms else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay an LED recording")
+    parser.add_argument("command", choices=("info", "replay"))
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed (2 = twice as fast)")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for key, value in summary(args.path).items():
+            print(f"{key}: {value}")
+        return
+
+    count, _ = read_header(args.path)
+    try:
+        from rpi_ws281x import Adafruit_NeoPixel
+    except ImportError:  # not on the Pi: play to the simulated strip
+        from neopixel_sim import Adafruit_NeoPixel
+    strip = Adafruit_NeoPixel(count, 18, 800000, 10, False, 255)
+    strip.begin()
+    late = replay(args.path, strip, args.speed)
+    print(f"Replayed {args.path} at {args.speed}x (worst lateness {late * 1000:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import numpy as np
+
+from led_buffer import StripWriter
+
+# -------- Several strips as one canvas --------
+# A WS281x strip takes about 30 us per LED to send, so one 600 LED strip
+# tops out around 55 fps. Split across two outputs that each send 300 LEDs
+# at the same time, the same canvas still refreshes at ~110 fps.
+#
+# MultiStrip looks like a single Adafruit_NeoPixel to the LED engine. Pixel
+# 0 of the canvas is the first pixel of the first segment. A `reverse`
+# segment is wired the other way round (e.g. a strip folded back on itself).
+# A frame only show()s the strips whose pixels changed.
+#
+# Only the DMA-driven outputs send in parallel: GPIO 18 (PWM) and GPIO 21
+# (PCM), each with its own DMA channel. For those rpi_ws281x's show()
+# returns once the DMA transfer has started. A strip on GPIO 10 (SPI) works
+# too, but its show() is a blocking SPI ioctl without DMA, so it sends
+# before or after the others, not alongside them: 3 x 300 LEDs on PWM, PCM
+# and SPI refresh like 600, not like 300.
+
+
+class Segment:
+    def __init__(self, strip, reverse=False):
+        self.strip = strip
+        self.count = strip.numPixels()
+        self.reverse = reverse
+        self.start = 0           # canvas index of this segment's first pixel
+        self.writer = StripWriter(strip)
+        self.buf = np.zeros(self.count, dtype=np.uint32) if reverse else None
+        self.dirty = False
+
+
+class MultiStrip:
+    def __init__(self, segments):
+        self.segments = [s if isinstance(s, Segment) else Segment(s) for s in segments]
+        start = 0
+        for seg in self.segments:
+            seg.start = start
+            start += seg.count
+        self.num = start
+        self.shows = 0
+
+    def _spans(self, start, stop):
+        """(segment, canvas lo, canvas hi) for every segment overlapping [start, stop)."""
+        for seg in self.segments:
+            lo, hi = max(start, seg.start), min(stop, seg.start + seg.count)
+            if lo < hi:
+                yield seg, lo, hi
+
+    # -------- Used by led_buffer.StripWriter --------
+    def copy_pixels(self, pixels, start, stop):
+        for seg, lo, hi in self._spans(start, stop):
+            if seg.reverse:
+                # canvas [lo, hi) lands back to front on strip [end - hi, end - lo)
+                end = seg.start + seg.count
+                seg.buf[end - hi:end - lo] = pixels[lo:hi][::-1]
+                seg.writer.write(seg.buf, end - hi, end - lo)
+            else:
+                seg.writer.write(pixels[seg.start:seg.start + seg.count], lo - seg.start, hi - seg.start)
+            seg.dirty = True
+
+    # -------- rpi_ws281x API --------
+    def begin(self):
+        for seg in self.segments:
+            seg.strip.begin()
+
+    def show(self):
+        for seg in self.segments:
+            if seg.dirty:
+                seg.strip.show()
+                seg.dirty = False
+        self.shows += 1
+
+    def _locate(self, n):
+        for seg in self.segments:
+            if n < seg.start + seg.count:
+                i = n - seg.start
+                return seg, (seg.count - 1 - i) if seg.reverse else i
+        raise IndexError(n)
+
+    def setPixelColor(self, n, color):
+        seg, i = self._locate(n)
+        seg.strip.setPixelColor(i, color)
+        seg.dirty = True
+
+    def getPixelColor(self, n):
+        seg, i = self._locate(n)
+        return seg.strip.getPixelColor(i)
+
+    def numPixels(self):
+        return self.num
+
+    def setBrightness(self, brightness):
+        for seg in self.segments:
+            seg.strip.setBrightness(brightness)
+
+    def getBrightness(self):
+        return self.segments[0].strip.getBrightness()
+
+    # -------- neopixel_sim measurements --------
+    def report(self):
+        """Like neopixel_sim's report(), for the whole canvas."""
+        reports = [seg.strip.report() for seg in self.segments]
+        shown = [r for r in reports if r["shows"]]
+        span = 0.0
+        if shown:
+            span = (max(r["last_show"] for r in shown) - min(r["first_show"] for r in shown)
+                    + max(r["wire_time_per_show_ms"] for r in shown) / 1000)
+        return {
+            "leds": self.num,
+            "shows": self.shows,
+            "wire_time_per_show_ms": max(r["wire_time_per_show_ms"] for r in reports),
+            "wire_time_total_s": sum(r["wire_time_total_s"] for r in reports),
+            "stalled_s": max(r["stalled_s"] for r in reports),
+            "max_fps": min(r["max_fps"] for r in reports),
+            "effective_fps": self.shows / span if span > 0 else 0.0,
+        }
@@ -0,0 +1,114 @@
+try:
+    from rpi_ws281x import Color
+except ImportError:  # not on the Pi
+    from neopixel_sim import Color
+
+import numpy as np
+
+from led_cache import FrameSequence
+from led_compositor import unpack, pack
+
+# -------- Declarative LED shows --------
+# A show is a list of steps written as data; compile_show() turns it into a
+# FrameSequence once at load time, and led_cache.play() replays it with one
+# blit per picture. Changing or adding a show is a table edit.
+#
+# Step keys (all optional except "color"):
+#   color   packed colour to show (0 = off)
+#   on      seconds the colour stays up                     (default: 1 frame)
+#   off     seconds of darkness after each repeat          (default 0)
+#   repeat  how many times to play the step                 (default 1)
+#   fade    seconds to ease in from the previous picture    (default 0)
+#   ease    "linear", "in", "out" or "in_out"               (default "linear")
+#   every   light single pixels this far apart, one more per repeat, on top of
+#           the current picture instead of filling the strip
+#
+# A show always ends on a dark strip. If its last step already ends dark
+# (an "off" gap, or color 0 with an "on" time) that time is kept, so the
+# show lasts until it runs out; otherwise the strip goes dark as the show
+# ends, with no hold of its own.
+
+BLUE, GREEN = Color(0, 0, 255), Color(0, 255, 0)
+ORANGE, YELLOW = Color(255, 140, 0), Color(255, 255, 0)
+
+EASINGS = {
+    "linear": lambda t: t,
+    "in":     lambda t: t * t,
+    "out":    lambda t: 1 - (1 - t) * (1 - t),
+    "in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+
+def _blinks(color, seconds, times=6):
+    return {"color": color, "on": seconds, "off": seconds, "repeat": times}
+
+
+# Stage start: blue flashes, quicker each level, then solid green for 2 s.
+LEVEL_START_SHOWS = {
+    1: [_blinks(BLUE, 0.3),  {"color": GREEN, "on": 2}],
+    2: [_blinks(BLUE, 0.2),  {"color": GREEN, "on": 2}],
+    3: [_blinks(BLUE, 0.15), {"color": GREEN, "on": 2}],
+    4: [_blinks(BLUE, 0.1),  {"color": GREEN, "on": 2}],
+    "default": [_blinks(BLUE, 0.25), {"color": GREEN, "on": 2}],
+}
+
+# The per-level colours the MVP uses (MVP/game code.py plays these).
+LEVEL_START_SHOWS_MVP = {
+    1: [_blinks(BLUE, 0.25),         {"color": GREEN, "on": 2}],
+    2: [_blinks(ORANGE, 0.1, 5),     {"color": GREEN, "on": 2}],
+    3: [_blinks(YELLOW, 0.3, 3),     {"color": GREEN, "on": 2}],
+    4: [{"color": GREEN, "on": 0.1, "every": 50, "repeat": 6}, {"color": GREEN, "on": 2}],
+    "default": [_blinks(BLUE, 0.25), {"color": GREEN, "on": 2}],
+}
+
+
+def compile_show(steps, count, fps):
+    """Turn a list of steps into a FrameSequence for a `count` pixel strip."""
+    period = 1.0 / fps
+    frames, holds = [], []
+    dark = np.zeros(count, dtype=np.uint32)
+    current = dark
+
+    def emit(pixels, hold):
+        if frames and np.array_equal(frames[-1], pixels):
+            holds[-1] += hold
+        else:
+            frames.append(pixels)
+            holds.append(hold)
+
+    for step in steps:
+        color = step["color"]
+        on = step.get("on", period)
+        off = step.get("off", 0)
+        fade = step.get("fade", 0)
+        ease = EASINGS[step.get("ease", "linear")]
+        every = step.get("every")
+        for r in range(step.get("repeat", 1)):
+            if every:
+                target = current.copy()
+                target[0:every * (r + 1):every] = color
+            else:
+                target = np.full(count, color, dtype=np.uint32)
+
+            n = int(round(fade * fps))
+            if n > 1:
+                t = ease(np.arange(1, n, dtype=np.float32) / n)
+                a, b = unpack(current), unpack(target)
+                mix = a + (b - a) * t[:, None, None]
+                for pixels in pack(mix.reshape(-1, 3)).reshape(n - 1, count):
+                    emit(pixels, period)
+            emit(target, on)
+            current = target
+            if off:
+                current = dark
+                emit(current, off)
+
+    if current.any():
+        emit(dark, 0.0)  # like led_cache.render(): the last picture has no hold of its own
+    return FrameSequence(np.array(frames, dtype=np.uint32).reshape(len(frames), count),
+                         np.array(holds, dtype=np.float64))
+
+
+def compile_shows(table, count, fps):
+    """Compile every show in a {key: steps} table."""
+    return {key: compile_show(steps, count, fps) for key, steps in table.items()}
@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+
+from led_buffer import split_rgb
+from led_compositor import pack
+from led_effects import STEP
+
+# -------- Where each LED is on the board --------
+# The strip is laid out as a lightning bolt on the board (AssetsFolder/
+# Neopixel.png). pixel_map.json lists the corners of that path from the
+# first LED (where the cable comes in) to the last; the LEDs are spaced
+# evenly along it. Everything an effect needs per pixel (x, y, position
+# along the strip, distance from a point, position across the board) is
+# computed once as a NumPy array, so a 2D effect is a handful of array
+# operations per frame instead of a Python loop over the LEDs.
+#
+# Coordinates are scaled so the longer side of the glyph is 1.0 and (0, 0)
+# is its centre; x grows to the right and y grows upwards.
+
+
+class PixelMap:
+    def __init__(self, x, y):
+        x = np.asarray(x, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        cx, cy = (x.min() + x.max()) / 2, (y.min() + y.max()) / 2
+        scale = max(np.ptp(x), np.ptp(y)) or 1.0
+        self.x = (x - cx) / scale
+        self.y = (y - cy) / scale
+        self.count = len(self.x)
+        self.t = np.linspace(0.0, 1.0, self.count, dtype=np.float32)  # position along the strip
+        self._fields = {}
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def from_path(cls, points, count, flip_y=True):
+        """Space `count` LEDs evenly along a polyline of (x, y) corners."""
+        pts = np.asarray(points, dtype=np.float64)
+        seg = np.hypot(*np.diff(pts, axis=0).T)
+        along = np.concatenate(([0.0], np.cumsum(seg)))
+        at = np.linspace(0.0, along[-1], count)
+        x = np.interp(at, along, pts[:, 0])
+        y = np.interp(at, along, pts[:, 1])
+        return cls(x, -y if flip_y else y)
+
+    @classmethod
+    def load(cls, path, count):
+        """Read a pixel_map.json: {"path": [[x, y], ...]} in image coordinates (y down)."""
+        with open(path) as f:
+            data = json.load(f)
+        return cls.from_path(data["path"], count)
+
+    def distance(self, origin=(0.0, 0.0)):
+        """Distance of every LED from `origin`; cached per origin."""
+        key = ("d", origin)
+        field = self._fields.get(key)
+        if field is None:
+            field = self._fields[key] = np.hypot(self.x - origin[0], self.y - origin[1])
+        return field
+
+    def projection(self, angle):
+        """Every LED's position along a direction `angle` degrees from +x, from 0 to 1."""
+        key = ("p", angle)
+        field = self._fields.get(key)
+        if field is None:
+            a = np.radians(angle)
+            p = self.x * np.cos(a) + self.y * np.sin(a)
+            field = self._fields[key] = (p - p.min()) / (np.ptp(p) or 1.0)
+        return field
+
+
+def shade(color, level):
+    """`color` scaled per pixel by `level` (0.0 - 1.0 array) -> packed pixels."""
+    rgb = np.array(split_rgb(color), dtype=np.float32)
+    return pack(np.clip(level, 0.0, 1.0)[:, None] * rgb)
+
+
+# -------- 2D effects --------
+# Same contract as led_effects.py: draw into `fb`, yield how long to hold.
+
+def radial_burst(fb, pmap, color, origin=(0.0, 0.0), duration=0.6, width=0.12):
+    """A ring of light that grows out of `origin` until it has left the glyph."""
+    d = pmap.distance(origin)
+    reach = float(d.max()) + width
+    frames = max(1, int(round(duration / STEP)))
+    for i in range(1, frames + 1):
+        r = reach * i / frames
+        fb.blit(shade(color, 1.0 - np.abs(d - r) / width))
+        yield STEP
+    fb.clear()
+
+
+def angle_wipe(fb, pmap, color, angle=90, duration=0.8, edge=0.08):
+    """Fill the glyph with `color`, sweeping in from the side opposite `angle` (90 = upwards)."""
+    p = pmap.projection(angle)
+    frames = max(1, int(round(duration / STEP)))
+    for i in range(1, frames + 1):
+        front = (1.0 + edge) * i / frames
+        fb.blit(shade(color, (front - p) / edge))
+        yield STEP
+
+
+def glow(fb, pmap, color, origin=(0.0, 0.0), radius=0.25, duration=0.5):
+    """Light everything near `origin`, brightest at the point itself, fading out."""
+    falloff = np.clip(1.0 - pmap.distance(origin) / radius, 0.0, 1.0) ** 2
+    frames = max(1, int(round(duration / STEP)))
+    for i in range(frames):
+        fb.blit(shade(color, falloff * (1.0 - i / frames)))
+        yield STEP
+    fb.clear()
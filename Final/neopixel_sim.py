@@ -0,0 +1,127 @@
+import sys
+import time
+import types
+
+import numpy as np
+
+# -------- Simulated NeoPixel strip --------
+# Drop-in stand-in for rpi_ws281x's Adafruit_NeoPixel and Color so lighting
+# code can run (and be timed) on a machine without the Pi's PWM/DMA driver.
+#
+# Timing model (WS281x at 800 kHz): every LED is 24 bits of 1.25 us, about
+# 30 us per LED, followed by a latch/reset gap. Like the real driver, show()
+# starts the transfer and returns; the *next* show() waits for the previous
+# transfer to finish. With realtime=False nothing sleeps and the wire time is
+# only added up. `clock` (anything with monotonic() and sleep(), the time
+# module by default) lets the benchmarks run the strip on a virtual clock.
+
+BITS_PER_LED = 24
+RESET_US = 55  # rpi_ws281x's LED_RESET_uS
+
+
+def Color(red, green, blue, white=0):
+    """Same packing as rpi_ws281x.Color: 0xWWRRGGBB."""
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+class Adafruit_NeoPixel:
+    def __init__(self, num, pin, freq_hz=800000, dma=10, invert=False,
+                 brightness=255, channel=0, strip_type=None,
+                 realtime=True, record=False, max_frames=10000, clock=time):
+        self.num = num
+        self.pin = pin
+        self.freq_hz = freq_hz
+        self.brightness = brightness
+        self.realtime = realtime
+        self.clock = clock
+        self.record = record
+        self.max_frames = max_frames
+
+        self._led_data = np.zeros(num, dtype=np.uint32)
+        self.wire_time = (num * BITS_PER_LED) / float(freq_hz) + RESET_US / 1e6
+        self.reset_stats()  # also sets up self.frames: (time, pixels) when record=True
+
+    # -------- rpi_ws281x API --------
+    def begin(self):
+        pass
+
+    def show(self):
+        # `_stall` is the waiting we skipped when realtime=False; adding it
+        # back gives the clock the strip would have been running on.
+        now = self.clock.monotonic() + self._stall
+        if now < self._busy_until:
+            if self.realtime:
+                self.clock.sleep(self._busy_until - now)
+            else:
+                self._stall += self._busy_until - now
+            now = self._busy_until
+        if self._first_show is None:
+            self._first_show = now
+        self._last_show = now
+        self._busy_until = now + self.wire_time
+        self._wire_total += self.wire_time
+        self.shows += 1
+        if self.record and len(self.frames) < self.max_frames:
+            self.frames.append((now, self._led_data.copy()))
+
+    def setPixelColor(self, n, color):
+        self._led_data[n] = color
+
+    def setPixelColorRGB(self, n, red, green, blue, white=0):
+        self.setPixelColor(n, Color(red, green, blue, white))
+
+    def getPixelColor(self, n):
+        return int(self._led_data[n])
+
+    def getPixels(self):
+        return self._led_data
+
+    def numPixels(self):
+        return self.num
+
+    def setBrightness(self, brightness):
+        self.brightness = brightness
+
+    def getBrightness(self):
+        return self.brightness
+
+    # -------- Measurements --------
+    def reset_stats(self):
+        self.shows = 0
+        self.frames = []
+        self._busy_until = 0.0
+        self._wire_total = 0.0
+        self._stall = 0.0
+        self._first_show = None
+        self._last_show = None
+
+    def report(self):
+        """What this run would have looked like on the real strip."""
+        span = 0.0
+        if self._first_show is not None:
+            span = (self._last_show - self._first_show) + self.wire_time
+        return {
+            "leds": self.num,
+            "shows": self.shows,
+            "wire_time_per_show_ms": self.wire_time * 1000,
+            "wire_time_total_s": self._wire_total,
+            "stalled_s": self._stall,
+            "max_fps": 1.0 / self.wire_time,
+            "effective_fps": self.shows / span if span > 0 else 0.0,
+            "first_show": self._first_show,
+            "last_show": self._last_show,
+        }
+
+
+def install():
+    """
+    Register this module as `rpi_ws281x`, so scripts that do
+    `from rpi_ws281x import *` (e.g. MVP/game code.py) pick up the simulator.
+    """
+    module = types.ModuleType("rpi_ws281x")
+    module.Adafruit_NeoPixel = Adafruit_NeoPixel
+    module.PixelStrip = Adafruit_NeoPixel
+    module.Color = Color
+    module.__all__ = ["Adafruit_NeoPixel", "PixelStrip", "Color"]
+    sys.modules["rpi_ws281x"] = module
+    return module
@@ -0,0 +1,156 @@
+import socket
+import struct
+import ctypes
+import ctypes.util
+
+# -------- Several datagrams in one system call --------
+# A stage win sends eight or more packets to GrandMA and REAPER at once;
+# each sendto() is a separate system call, which on a Pi costs more than
+# building the packet. Linux's sendmmsg() sends a whole list of datagrams,
+# each to its own address, in one call.
+#
+# Python's socket module has no sendmmsg(), so BatchSocket calls the C
+# library's through ctypes. Where that isn't available (macOS, Windows) or
+# the call fails, it sends the rest one sendto() at a time, so callers never
+# need to care which path ran.
+#
+#     batch = BatchSocket()
+#     calls = batch.send([(dgram1, ("192.168.254.213", 2000)),
+#                         (dgram2, ("192.168.254.12", 8000))])   # -> 1 on Linux
+#
+# Longer lists go out `capacity` (64) datagrams per call.
+
+
+class _sockaddr_in(ctypes.Structure):
+    _fields_ = [("sin_family", ctypes.c_ushort),
+                ("sin_port", ctypes.c_uint16),
+                ("sin_addr", ctypes.c_uint8 * 4),
+                ("sin_zero", ctypes.c_uint8 * 8)]
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p),
+                ("iov_len", ctypes.c_size_t)]
+
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p),
+                ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(_iovec)),
+                ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p),
+                ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _msghdr),
+                ("msg_len", ctypes.c_uint)]
+
+
+def _load_sendmmsg():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError, TypeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]  # fd, mmsghdr *, count, flags
+    func.restype = ctypes.c_int
+    return func
+
+
+_sendmmsg = _load_sendmmsg()
+
+
+# Native layouts ("P" pointer, "N" size_t) so the same code works on 32 and 64 bit
+_IOV = struct.Struct("@PN")                                  # iov_base, iov_len
+_PTR = struct.Struct("@P")
+_NAMELEN = struct.Struct("@I")
+_HDR_SIZE = ctypes.sizeof(_mmsghdr)
+_IOV_SIZE = ctypes.sizeof(_iovec)
+
+
+class BatchSocket:
+    def __init__(self, use_sendmmsg=True, capacity=64, data_size=65536):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.batched = use_sendmmsg and _sendmmsg is not None
+        self._addrs = {}  # (ip, port) -> (_sockaddr_in, its address), built once per destination
+        self.capacity = capacity
+        # One fixed block of memory holds the headers, the iovecs and the
+        # datagrams themselves. It is filled with struct.pack_into and slice
+        # copies (a ctypes attribute per field would cost more than the
+        # system calls saved) and handed to sendmmsg() by address.
+        self._iov_at = capacity * _HDR_SIZE
+        self._data_at = self._iov_at + capacity * _IOV_SIZE
+        self._data_size = data_size
+        self._arena = bytearray(self._data_at + data_size)
+        self._base = ctypes.addressof(ctypes.c_char.from_buffer(self._arena))
+        name_off = _mmsghdr.msg_hdr.offset + _msghdr.msg_name.offset
+        namelen_off = _mmsghdr.msg_hdr.offset + _msghdr.msg_namelen.offset
+        iov_off = _mmsghdr.msg_hdr.offset + _msghdr.msg_iov.offset
+        iovlen_off = _mmsghdr.msg_hdr.offset + _msghdr.msg_iovlen.offset
+        self._name_at = [i * _HDR_SIZE + name_off for i in range(capacity)]
+        for i in range(capacity):
+            at = i * _HDR_SIZE
+            _NAMELEN.pack_into(self._arena, at + namelen_off, ctypes.sizeof(_sockaddr_in))
+            _PTR.pack_into(self._arena, at + iov_off, self._base + self._iov_at + i * _IOV_SIZE)
+            struct.pack_into("@N", self._arena, at + iovlen_off, 1)
+
+    @staticmethod
+    def supported():
+        """Whether this platform has sendmmsg()."""
+        return _sendmmsg is not None
+
+    def _addr(self, dest):
+        entry = self._addrs.get(dest)
+        if entry is None:
+            ip, port = dest
+            sa = _sockaddr_in()
+            sa.sin_family = socket.AF_INET
+            sa.sin_port = socket.htons(port)
+            sa.sin_addr[:] = socket.inet_aton(socket.gethostbyname(ip))
+            entry = self._addrs[dest] = (sa, ctypes.addressof(sa))
+        return entry[1]
+
+    def send(self, datagrams):
+        """Send [(bytes, (ip, port)), ...] in order; returns the number of system calls used."""
+        if not datagrams:
+            return 0
+        done, calls = 0, 0
+        # `capacity` datagrams per sendmmsg(); anything it couldn't take
+        # (an error, a datagram too big for the arena) goes out by sendto()
+        while self.batched and len(datagrams) - done > 1:
+            sent, used = self._sendmmsg(datagrams[done:done + self.capacity])
+            calls += used
+            if not sent:
+                break
+            done += sent
+        for dgram, dest in datagrams[done:]:
+            self.sock.sendto(dgram, dest)
+            calls += 1
+        return calls
+
+    def _sendmmsg(self, datagrams):
+        arena, base = self._arena, self._base
+        pos, end = self._data_at, self._data_at + self._data_size
+        n = 0
+        for i, (dgram, dest) in enumerate(datagrams):
+            size = len(dgram)
+            if pos + size > end:
+                break  # out of room: the rest go out one by one
+            arena[pos:pos + size] = dgram
+            _IOV.pack_into(arena, self._iov_at + i * _IOV_SIZE, base + pos, size)
+            _PTR.pack_into(arena, self._name_at[i], self._addr(dest))
+            pos += size
+            n = i + 1
+        done, calls = 0, 0
+        while done < n:
+            sent = _sendmmsg(self.sock.fileno(), base + done * _HDR_SIZE, n - done, 0)
+            calls += 1
+            if sent <= 0:  # error: let the caller's sendto() loop send the rest (and raise)
+                break
+            done += sent
+        return done, calls
+
+    def close(self):
+        self.sock.close()
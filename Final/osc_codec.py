@@ -0,0 +1,191 @@
+import struct
+
+from pythonosc import osc_message_builder
+
+# -------- Fast OSC encode/decode for the game's own messages --------
+# Nearly everything the game sends or receives is one of a few shapes:
+#     /action/1007 1.0                   one float
+#     /gma3/cmd "Go Sequence 23 cue 1"   one string
+#     /print ["Sensor 3 Pressed", 17, 850]  a list of strings, ints and floats
+# python-osc builds and parses these through general-purpose builder and
+# parser objects: several Python objects and byte strings per message. On
+# the Pi, during a burst of sensor presses, that is most of the CPU spent
+# per packet.
+#
+# OscEncoder writes those shapes straight into one preallocated bytearray
+# with struct.pack_into and returns a memoryview of it; nothing is built
+# along the way. Address and type-tag bytes are encoded once and remembered.
+# The view is only valid until the next encode() on the same encoder, so
+# send it right away and use one encoder per thread.
+#
+#     enc = OscEncoder()
+#     sock.sendto(enc.encode("/print", ["Sensor 3 Pressed"]), (ip, port))
+#
+# OscDecoder.decode() reads the same shapes with struct.unpack_from and
+# returns (address, args). It reads a reused receive buffer in place (see
+# osc_ingest.py): only the address and the arguments become new objects.
+# For anything else (bundles, blobs, other types) it returns None and the
+# caller parses the packet with python-osc.
+# encode() falls back to python-osc's builder the same way.
+
+MAX_REMEMBERED = 256  # strings an encoder/decoder keeps; any beyond that are converted each time
+
+_FLOAT = struct.Struct(">f")
+_INT = struct.Struct(">i")
+_TAGS = {str: "s", float: "f", int: "i"}  # bool is its own class, so True/False fall back
+_STRINGS = {}  # padded length -> Struct("<n>s"), which zero-fills the padding
+
+
+def _string(size):
+    """Struct for an OSC string of `size` bytes: NUL terminated, padded to 4."""
+    padded = (size // 4 + 1) * 4
+    st = _STRINGS.get(padded)
+    if st is None:
+        st = _STRINGS[padded] = struct.Struct(f"{padded}s")
+    return st
+
+
+class OscEncoder:
+    def __init__(self, size=1024):
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._bytes = {}  # str -> utf-8 bytes, for addresses and repeated string args
+        self.fallbacks = 0
+
+    def _put(self, text, off):
+        raw = self._bytes.get(text)
+        if raw is None:
+            raw = text.encode("utf-8")
+            if len(self._bytes) < MAX_REMEMBERED:
+                self._bytes[text] = raw
+        st = _string(len(raw))
+        st.pack_into(self._buf, off, raw)
+        return off + st.size
+
+    def encode(self, address, value):
+        """The datagram for `address` with `value` (one argument or a list of them)."""
+        try:
+            return self._encode(address, value)
+        except (struct.error, IndexError):  # too big for the buffer
+            return self._fallback(address, value)
+
+    def _encode(self, address, value):
+        buf = self._buf
+        cls = value.__class__
+        if cls is float:
+            off = self._put(",f", self._put(address, 0))
+            _FLOAT.pack_into(buf, off, value)
+            return self._view[:off + 4]
+        if cls is int:
+            off = self._put(",i", self._put(address, 0))
+            _INT.pack_into(buf, off, value)
+            return self._view[:off + 4]
+        if cls is str:
+            return self._view[:self._put(value, self._put(",s", self._put(address, 0)))]
+        if cls is list or cls is tuple:
+            tags = ","
+            for v in value:
+                tag = _TAGS.get(v.__class__)
+                if tag is None:
+                    return self._fallback(address, value)
+                tags += tag
+            off = self._put(tags, self._put(address, 0))
+            for v in value:
+                c = v.__class__
+                if c is str:
+                    off = self._put(v, off)
+                elif c is float:
+                    _FLOAT.pack_into(buf, off, v)
+                    off += 4
+                else:
+                    _INT.pack_into(buf, off, v)
+                    off += 4
+            return self._view[:off]
+        return self._fallback(address, value)
+
+    def _fallback(self, address, value):
+        self.fallbacks += 1
+        msg = osc_message_builder.OscMessageBuilder(address=address)
+        for arg in value if isinstance(value, (list, tuple)) else (value,):
+            msg.add_arg(arg)
+        return msg.build().dgram
+
+
+class OscDecoder:
+    def __init__(self):
+        self._text = {}  # address bytes -> str, for the few addresses we get
+        self._last = (b"", "")  # the last address seen, checked first
+        self._data = None
+        self._view = None  # memoryview of `_data`, kept while the same buffer comes back
+        self.fallbacks = 0
+
+    def _view_of(self, data):
+        if data is not self._data:
+            self._data, self._view = data, memoryview(data)
+        return self._view
+
+    def _address(self, data, end):
+        raw, address = self._last
+        if raw and len(raw) == end and data.startswith(raw):
+            return address
+        raw = bytes(data[:end])
+        address = self._text.get(raw)
+        if address is None:
+            if not raw.startswith(b"/"):  # "#bundle" or garbage
+                return None
+            address = raw.decode("utf-8")
+            if len(self._text) < MAX_REMEMBERED:
+                self._text[raw] = address
+        self._last = (raw, address)
+        return address
+
+    def decode(self, data, size=None):
+        """
+        (address, args) for a plain message of floats, ints and strings, else
+        None. `data` can be a reused receive buffer with the packet in its
+        first `size` bytes: it is read in place, and only the address, string
+        and number arguments are copied out of it.
+        """
+        size = len(data) if size is None else size
+        try:
+            end = data.find(b"\0", 0, size)
+            if end < 0:
+                raise ValueError("no address")
+            address = self._address(data, end)
+            if address is None:
+                self.fallbacks += 1
+                return None
+            off = (end // 4 + 1) * 4
+            if off >= size or data[off] != 44:  # no type tags: no arguments
+                return address, ()
+            tag_end = data.find(b"\0", off, size)
+            if tag_end < 0:
+                raise ValueError("no type tag end")
+            view = self._view_of(data)
+            args = []
+            pos = (tag_end // 4 + 1) * 4
+            for i in range(off + 1, tag_end):
+                tag = data[i]
+                if tag == 102:    # f
+                    if pos + 4 > size:
+                        raise ValueError("short packet")
+                    args.append(_FLOAT.unpack_from(data, pos)[0])
+                    pos += 4
+                elif tag == 115:  # s
+                    s_end = data.find(b"\0", pos, size)
+                    if s_end < 0:
+                        raise ValueError("unterminated string")
+                    args.append(str(view[pos:s_end], "utf-8"))
+                    pos = (s_end // 4 + 1) * 4
+                elif tag == 105:  # i
+                    if pos + 4 > size:
+                        raise ValueError("short packet")
+                    args.append(_INT.unpack_from(data, pos)[0])
+                    pos += 4
+                else:
+                    self.fallbacks += 1
+                    return None
+            return address, args
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self.fallbacks += 1
+            return None
@@ -0,0 +1,215 @@
+"""
+Stand-ins for the GrandMA3 console and REAPER.
+
+Each emulator listens for the same OSC messages the real one gets from the
+game and the AV control panel, keeps a simple model of what that would have
+done (which sequences are running and on which cue; REAPER's transport and
+play position) and logs every packet with the time it arrived and the time
+it was handled. A processing delay (with jitter) and packet loss can be set
+to imitate a busy console or a bad network.
+
+    python3 osc_emulators.py                        # GrandMA on 2000, REAPER on 8000
+    python3 osc_emulators.py --delay-ms 5 --loss 0.01
+
+then point GMA_IP/REAPER_IP in final code.py or gui.py at this machine.
+osc_loadtest.py starts them itself and measures cue latency under load.
+"""
+import re
+import time
+import random
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple, Counter
+
+from osc_ingest import IngestServer
+
+# One received message. `received` is when it reached the socket (see
+# osc_ingest.py), so it stays right while earlier messages hold the emulator
+# up. `handled` is None for a message dropped on purpose.
+Received = namedtuple("Received", "address args received handled")
+
+
+class Emulator(IngestServer, ABC):
+    """An IngestServer that models a device: delay, loss and a log of every message."""
+
+    def __init__(self, ip="127.0.0.1", port=0, delay=0.0, jitter=0.0, loss=0.0, seed=None, log_size=100000):
+        super().__init__(ip, port)
+        self.delay = delay
+        self.jitter = jitter
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.log = deque(maxlen=log_size)
+        self.dropped = 0
+        self.unknown = Counter()  # addresses/commands the model doesn't know
+
+    def dispatch(self, event):
+        if self.loss and self.random.random() < self.loss:
+            self.dropped += 1
+            self.log.append(Received(event.address, tuple(event.args), event.received, None))
+            return
+        wait = self.delay + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if wait > 0:
+            # A console handles one command at a time, so later packets queue behind this one
+            time.sleep(wait)
+        self.handle(event.address, event.args)
+        self.log.append(Received(event.address, tuple(event.args), event.received, time.perf_counter()))
+
+    @abstractmethod
+    def handle(self, address, args):
+        """Apply one message to the model."""
+
+    @abstractmethod
+    def state(self):
+        """The model as a plain dict."""
+
+    def snapshot(self, timeout=1.0):
+        """state(), taken on the emulator's own thread so it can't change halfway through."""
+        out, done = {}, threading.Event()
+
+        def take():
+            out.update(self.state())
+            done.set()
+
+        self.call_soon(take)
+        done.wait(timeout)
+        return out
+
+
+# -------- GrandMA3 --------
+_SEQ = r"seq(?:uence)?\s+(\d+)"
+_COMMANDS = [
+    ("go",      re.compile(rf"^go\s+{_SEQ}\s+cue\s+([\d.]+)$")),
+    ("go_plus", re.compile(rf"^go\+\s+{_SEQ}$")),
+    ("on",      re.compile(rf"^on\s+{_SEQ}$")),
+    ("off",     re.compile(rf"^(?:off|release)\s+{_SEQ}(?:\s+cue\s+[\d.]+)?$")),
+    ("off_all", re.compile(r"^off\s+sequence\s+thru(?:\s+please)?$")),
+]
+
+
+class GrandMA3Emulator(Emulator):
+    """
+    /gma3/cmd "<command line>". Understands Go/Go+/On/Off/Release Sequence and
+    "Off sequence thru"; several commands can be joined with ";" as on the
+    console. Anything else (e.g. the "Win Stage" macro) is counted by name.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sequences = {}   # number -> {"cue": "3", "on": True}
+        self.commands = 0
+
+    def handle(self, address, args):
+        if address != "/gma3/cmd" or not args:
+            self.unknown[address] += 1
+            return
+        for command in str(args[0]).split(";"):
+            self.command(command.strip())
+
+    def command(self, line):
+        self.commands += 1
+        text = line.lower()
+        for kind, pattern in _COMMANDS:
+            m = pattern.match(text)
+            if m:
+                break
+        else:
+            self.unknown[line] += 1
+            return
+        if kind == "off_all":
+            for seq in self.sequences.values():
+                seq["on"] = False
+            return
+        seq = self.sequences.setdefault(int(m.group(1)), {"cue": None, "on": False})
+        if kind == "go":
+            seq.update(cue=m.group(2), on=True)
+        elif kind == "go_plus":
+            cue = seq["cue"]
+            seq.update(cue="1" if cue is None else str(int(float(cue)) + 1), on=True)
+        elif kind == "on":
+            seq["on"] = True
+        else:
+            seq["on"] = False
+
+    def state(self):
+        return {
+            "commands": self.commands,
+            "running": {n: s["cue"] for n, s in sorted(self.sequences.items()) if s["on"]},
+            "unknown": dict(self.unknown),
+        }
+
+
+# -------- REAPER --------
+PLAY, STOP, GO_TO_START = 1007, 1016, 40042
+
+
+class ReaperEmulator(Emulator):
+    """
+    /action/<id> and /marker/<n>. Play, Stop and "go to start of project"
+    change the transport; a marker moves the play position; every other
+    action (the game's load-sound actions) is counted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.playing = False
+        self.position = "start"   # "start" or "marker <n>"
+        self.actions = Counter()
+        self.plays = 0
+
+    def handle(self, address, args):
+        kind, _, number = address.strip("/").partition("/")
+        if not number.isdigit():
+            self.unknown[address] += 1
+            return
+        number = int(number)
+        if kind == "marker":
+            self.position = f"marker {number}"
+        elif kind == "action":
+            self.actions[number] += 1
+            if number == PLAY:
+                self.playing = True
+                self.plays += 1
+            elif number == STOP:
+                self.playing = False
+            elif number == GO_TO_START:
+                self.position = "start"
+        else:
+            self.unknown[address] += 1
+
+    def state(self):
+        return {
+            "playing": self.playing,
+            "position": self.position,
+            "plays": self.plays,
+            "actions": dict(self.actions),
+            "unknown": dict(self.unknown),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local GrandMA3 and REAPER OSC stand-ins")
+    parser.add_argument("--ip", default="0.0.0.0")
+    parser.add_argument("--gma-port", type=int, default=2000)
+    parser.add_argument("--reaper-port", type=int, default=8000)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="processing time per message")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="+/- random variation of the delay")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of messages to drop (0-1)")
+    args = parser.parse_args()
+
+    opts = dict(delay=args.delay_ms / 1000, jitter=args.jitter_ms / 1000, loss=args.loss)
+    gma = GrandMA3Emulator(args.ip, args.gma_port, **opts).start()
+    reaper = ReaperEmulator(args.ip, args.reaper_port, **opts).start()
+    print(f"GrandMA3 on {args.ip}:{gma.port}, REAPER on {args.ip}:{reaper.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"GrandMA3: {gma.snapshot()}")
+            print(f"REAPER:   {reaper.snapshot()}")
+    except KeyboardInterrupt:
+        gma.shutdown()
+        reaper.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import sys
+import time
+import socket
+import struct
+import asyncio
+import threading
+from collections import deque, namedtuple
+
+from pythonosc import osc_packet
+
+from osc_codec import OscDecoder
+from percentiles import percentiles
+
+# -------- OSC input on one event loop --------
+# python-osc's ThreadingOSCUDPServer starts a new thread for every datagram.
+# Two sensor presses that arrive together then run print_args() at the same
+# time and both read-modify-write `count`, `tries` and `level`; under a burst
+# of presses most of the time goes into starting threads.
+#
+# IngestServer receives on a UDP socket watched by an asyncio loop running on
+# a single background thread. Each datagram is parsed there (bundles are unpacked) and
+# every message becomes an OscEvent that is handed to its handler right away,
+# on that same thread. Handlers therefore run one at a time, in the order the
+# packets arrived, and never overlap each other. Anything else that changes
+# the game state (the 0.1 s timer check) can be run on the same thread with
+# call_soon(), or call_later() after a delay, so it can't overlap a handler
+# either.
+#
+#     server = osc_ingest.IngestServer(LOCAL_IP, LOCAL_PORT)
+#     server.map("/print", print_args)        # print_args(address, *args)
+#     server.start()
+#     ...
+#     server.call_soon(check_timer)
+#     server.shutdown()
+#
+# Every datagram is received into one preallocated buffer (recv_into), and
+# plain messages (floats, ints, strings, e.g. /print "Sensor 3 Pressed") are
+# decoded from it in place by osc_codec.OscDecoder, so only the address and
+# arguments are new objects. Bundles and anything else are copied out and
+# parsed by python-osc.
+#
+# While a handler runs, `server.event` is the OscEvent it was called for
+# (e.g. for its `received` time).
+#
+# Handlers must not block: while one runs, later packets wait in the socket
+# buffer. An event's `received` is when the packet reached the socket, not
+# when the loop got round to it, so that wait is counted: on Linux the
+# kernel stamps each datagram (SO_TIMESTAMPNS) and the stamp is moved onto
+# time.perf_counter(). Elsewhere `received` falls back to the moment the
+# loop read the packet and stats()["kernel_timestamps"] is False. stats()
+# gives the packet count and how long each one took from arriving to its
+# handler returning.
+
+OscEvent = namedtuple("OscEvent", "address args received source")
+
+# Python's socket module doesn't export SO_TIMESTAMPNS; 35 is its value on Linux
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+_TIMESPEC = struct.Struct("@ll")  # tv_sec, tv_nsec, as the kernel hands them over
+_ANCILLARY = socket.CMSG_SPACE(_TIMESPEC.size) if hasattr(socket, "CMSG_SPACE") else 0
+MAX_DATAGRAM = 65535
+
+
+class IngestServer:
+    def __init__(self, ip, port, samples=4096):
+        self.ip = ip
+        self.port = port
+        self._handlers = {}
+        self._default = None
+        self._loop = None
+        self._sock = None
+        self.kernel_timestamps = False  # SO_TIMESTAMPNS arrival times in use
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._decoder = OscDecoder()  # only used on the loop thread
+        self._buf = bytearray(MAX_DATAGRAM)  # every packet is received into this, and decoded in place
+        self._view = memoryview(self._buf)
+        self.event = None             # the OscEvent being handled
+        # Only the loop thread writes these
+        self.packets = 0
+        self.events = 0
+        self.errors = 0
+        self.max_s = 0.0
+        self.total_s = 0.0
+        self._latency = deque(maxlen=samples)  # recent arrival -> handled times, for percentiles
+
+    def map(self, address, handler):
+        """Call handler(address, *args) for every message to `address`."""
+        self._handlers[address] = handler
+
+    def set_default_handler(self, handler):
+        """Called as handler(address, *args) for addresses with no mapping."""
+        self._default = handler
+
+    # -------- Lifecycle --------
+    def start(self, timeout=2.0):
+        """Bind and start the loop thread; returns once the socket is open."""
+        self._thread = threading.Thread(target=self._run, name=f"osc-ingest-{self.port}", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._error:
+            raise self._error
+        return self
+
+    def _open(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind((self.ip, self.port))
+        except OSError:
+            sock.close()
+            raise
+        sock.setblocking(False)
+        if SO_TIMESTAMPNS is not None and _ANCILLARY and hasattr(sock, "recvmsg"):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+                self.kernel_timestamps = True
+            except OSError:
+                pass
+        return sock
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._sock = self._open()
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        self.port = self._sock.getsockname()[1]  # port 0 -> the one picked
+        loop.add_reader(self._sock.fileno(), self._readable)
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def call_soon(self, func, *args):
+        """Run func(*args) on the ingest thread, in turn with the handlers."""
+        self._loop.call_soon_threadsafe(self._call, func, args)
+
+    def call_later(self, delay, func, *args):
+        """Run func(*args) on the ingest thread `delay` seconds from now."""
+        self._loop.call_soon_threadsafe(self._loop.call_later, delay, self._call, func, args)
+
+    def _call(self, func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            self.errors += 1
+            print(f"OSC ingest task {getattr(func, '__name__', func)} failed: {e}")
+
+    def shutdown(self, timeout=1.0):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # -------- Receive path --------
+    def _readable(self):
+        # One datagram per wake-up, like asyncio's own datagram transport, so
+        # call_soon() tasks get their turn between packets.
+        try:
+            if self.kernel_timestamps:
+                size, ancdata, _, addr = self._sock.recvmsg_into([self._buf], _ANCILLARY)
+                t = self._arrival(ancdata)
+            else:
+                size, addr = self._sock.recvfrom_into(self._buf)
+                t = time.perf_counter()
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            print(f"OSC ingest socket error: {e}")
+            return
+        self._received(size, addr, t)
+
+    @staticmethod
+    def _arrival(ancdata):
+        """The kernel's receive stamp (wall clock) moved onto perf_counter()."""
+        for level, kind, raw in ancdata:
+            if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(raw) >= _TIMESPEC.size:
+                sec, nsec = _TIMESPEC.unpack_from(raw)
+                return time.perf_counter() - (time.time() - (sec + nsec / 1e9))
+        return time.perf_counter()
+
+    def _received(self, size, addr, t):
+        self.packets += 1
+        fast = self._decoder.decode(self._buf, size)
+        if fast is not None:
+            self.dispatch(OscEvent(fast[0], fast[1], t, addr))
+        else:
+            try:
+                messages = osc_packet.OscPacket(bytes(self._view[:size])).messages
+            except osc_packet.ParseError as e:
+                self.errors += 1
+                print(f"Bad OSC packet from {addr[0]}:{addr[1]}: {e}")
+                return
+            for timed in messages:
+                msg = timed.message
+                self.dispatch(OscEvent(msg.address, msg.params, t, addr))
+        took = time.perf_counter() - t
+        self.total_s += took
+        if took > self.max_s:
+            self.max_s = took
+        self._latency.append(took)
+
+    def dispatch(self, event):
+        handler = self._handlers.get(event.address, self._default)
+        if handler is None:
+            return
+        self.events += 1
+        self.event = event
+        try:
+            handler(event.address, *event.args)
+        except Exception as e:
+            self.errors += 1
+            print(f"OSC handler for {event.address} failed: {e}")
+
+    def stats(self):
+        p = percentiles(list(self._latency), (50, 99), scale=1000)
+        return {
+            "packets": self.packets,
+            "events": self.events,
+            "slow_path": self._decoder.fallbacks,
+            "kernel_timestamps": self.kernel_timestamps,
+            "errors": self.errors,
+            "avg_ms": round(self.total_s / self.packets * 1000, 4) if self.packets else 0.0,
+            "p50_ms": p["p50"],
+            "p99_ms": p["p99"],
+            "max_ms": round(self.max_s * 1000, 4),
+        }
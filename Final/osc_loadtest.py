@@ -0,0 +1,171 @@
+"""
+OSC cue load test against the local GrandMA3/REAPER emulators.
+
+Starts both emulators (osc_emulators.py) on localhost and fires game events
+at them through osc_pool, the same send path the game uses: queued senders,
+pre-encoded cues and, unless --no-burst, one sendmmsg() burst per event. An
+event is one of the game's real cue sets, picked at random:
+  milestone   GrandMA "Go Sequence 23 cue N" + REAPER Stop -> SFX -> Play
+  stage_win   Win Stage, Go+ sequence 33, four Off Sequence, action 40042,
+              then Stop -> Stage Win -> Play
+  stage_lose  Lose Stage + Stop -> /marker/20 -> Play
+
+It reports, as JSON: messages sent, handled, dropped by the emulator and
+lost on the way; cue latency from the send call to the emulator finishing
+it (mean, p50, p95, p99, max) per destination; handled messages per second;
+the emulators' final state; and osc_pool's burst and queue counters.
+
+    python3 osc_loadtest.py --events 2000 --rate 200
+    python3 osc_loadtest.py --delay-ms 2 --jitter-ms 1 --loss 0.01 --out load.json
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from contextlib import nullcontext
+
+import osc_pool
+from percentiles import percentiles
+from osc_emulators import GrandMA3Emulator, ReaperEmulator
+
+STOP, PLAY = "/action/1016", "/action/1007"
+
+
+def milestone(n):
+    return [("gma", "/gma3/cmd", f"Go Sequence 23 cue {n % 4 + 1}"),
+            ("reaper", [(STOP, 1.0), (f"/action/{41261 + n % 4}", 1.0), (PLAY, 1.0)])]
+
+
+def stage_win(n):
+    return ([("gma", "/gma3/cmd", "Win Stage"), ("gma", "/gma3/cmd", "Go+ sequence 33")]
+            + [("gma", "/gma3/cmd", f"Off Sequence 23 cue {c}") for c in range(1, 5)]
+            + [("reaper", "/action/40042", 1.0),
+               ("reaper", [(STOP, 1.0), ("/action/41270", 1.0), (PLAY, 1.0)])])
+
+
+def stage_lose(n):
+    return [("gma", "/gma3/cmd", "Lose Stage"),
+            ("reaper", [(STOP, 1.0), ("/marker/20", 1.0), (PLAY, 1.0)])]
+
+
+EVENTS = {"milestone": (milestone, 0.7), "stage_win": (stage_win, 0.15), "stage_lose": (stage_lose, 0.15)}
+
+
+def latency_summary(values):
+    return {"mean": round(statistics.mean(values), 4) if values else 0.0, **percentiles(values),
+            "max": round(max(values), 4) if values else 0.0}
+
+
+def match(sent, log):
+    """
+    Pair each logged message with the send it came from. Both are in send
+    order per destination; sends with no log entry were lost on the way.
+    Returns (latencies in ms, messages lost before reaching the emulator).
+    """
+    latencies, lost, i = [], 0, 0
+    for entry in log:
+        while i < len(sent) and sent[i][:2] != (entry.address, entry.args):
+            i += 1
+            lost += 1
+        if i == len(sent):
+            break
+        if entry.handled is not None:
+            latencies.append((entry.handled - sent[i][2]) * 1000)
+        i += 1
+    return latencies, lost + len(sent) - i
+
+
+def run(args):
+    opts = dict(delay=args.delay_ms / 1000, jitter=args.jitter_ms / 1000, loss=args.loss, seed=args.seed)
+    emulators = {"gma": GrandMA3Emulator(**opts).start(), "reaper": ReaperEmulator(**opts).start()}
+    senders = {name: osc_pool.sender("127.0.0.1", emu.port, maxsize=args.queue) for name, emu in emulators.items()}
+    for name, emu in emulators.items():
+        warm = [cue for make, _ in EVENTS.values() for n in range(4) for cue in make(n)]
+        client = senders[name].client
+        client.preload((a, v) for d, *cue in warm if d == name and len(cue) == 2 for a, v in [cue])
+        for d, *cue in warm:
+            if d == name and len(cue) == 1:
+                client.preload_bundle(cue[0])
+
+    rng = random.Random(args.seed)
+    names, weights = list(EVENTS), [w for _, w in EVENTS.values()]
+    sent = {"gma": [], "reaper": []}
+    period = 1.0 / args.rate
+    start = time.perf_counter()
+    for n in range(args.events):
+        due = start + n * period
+        while time.perf_counter() < due:
+            time.sleep(min(0.001, max(0.0, due - time.perf_counter())))
+        cues = EVENTS[rng.choices(names, weights)[0]][0](n)
+        with osc_pool.burst() if args.burst else nullcontext():
+            for dest, *cue in cues:
+                t = time.perf_counter()
+                if len(cue) == 2:
+                    address, value = cue
+                    sent[dest].append((address, (value,), t))
+                    senders[dest].send_message(address, value)
+                else:
+                    sent[dest].extend((a, (v,), t) for a, v in cue[0])
+                    senders[dest].send_bundle(cue[0])
+    sending_s = time.perf_counter() - start
+
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline:
+        if all(len(emu.log) >= len(sent[name]) for name, emu in emulators.items()):
+            break
+        time.sleep(0.01)
+    time.sleep(0.05)  # let the last handlers finish
+
+    report = {"events": args.events, "rate": args.rate, "burst": args.burst,
+              "delay_ms": args.delay_ms, "loss": args.loss, "sending_s": round(sending_s, 3)}
+    all_latency, handled_times = [], []
+    for name, emu in emulators.items():
+        log = list(emu.log)
+        latency, lost = match(sent[name], log)
+        all_latency += latency
+        handled_times += [e.handled for e in log if e.handled is not None]
+        report[name] = {
+            "sent": len(sent[name]),
+            "handled": sum(1 for e in log if e.handled is not None),
+            "dropped": emu.dropped,
+            "lost": lost,
+            "latency_ms": latency_summary(latency),
+            "state": emu.snapshot(),
+        }
+        emu.shutdown()
+    span = (max(handled_times) - start) if handled_times else 0.0
+    report["latency_ms"] = latency_summary(all_latency)
+    report["handled_per_s"] = round(len(handled_times) / span, 1) if span > 0 else 0.0
+    report["bursts"] = osc_pool.burst_stats()
+    report["queues"] = {dest: s.get("queue") for dest, s in osc_pool.stats().items()}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the OSC cue path against local emulators")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200.0, help="events per second")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="emulated processing time per message")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of messages the emulators drop")
+    parser.add_argument("--queue", type=int, default=256, help="osc_pool sender queue size")
+    parser.add_argument("--no-burst", dest="burst", action="store_false", help="queue each send on its own")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=10.0, help="how long to wait for the emulators to catch up")
+    parser.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(f"{report['handled_per_s']} messages/s handled, cue latency p50 {report['latency_ms']['p50']} ms, "
+          f"p99 {report['latency_ms']['p99']} ms", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from pythonosc import udp_client, osc_bundle_builder, osc_message_builder
+
+from osc_batch import BatchSocket
+
+# -------- Shared OSC clients --------
+# One SimpleUDPClient (one UDP socket) per destination for the whole process,
+# instead of a new socket on every send. Any thread can send through the same
+# client. Each destination keeps send counts and how long the sends took.
+#
+#     reaper = osc_pool.client(REAPER_IP, REAPER_PORT)
+#     reaper.send_message("/action/1007", 1.0)
+#     osc_pool.stats()  # {"192.168.254.12:8000": {"sends": 12, ...}, ...}
+#
+# send_bundle() packs several messages into one OSC bundle: one datagram,
+# one timetag, so e.g. REAPER's Stop -> marker -> Play arrive together.
+#
+#     reaper.send_bundle([("/action/1016", 1.0), ("/marker/19", 1.0), ("/action/1007", 1.0)])
+#
+# sender(ip, port) has the same send_message()/send_bundle() but only queues
+# the send and returns; one background thread per destination does the
+# sendto(). A slow or stalled destination then can't hold up the sensor
+# handler or the Tk window. The queue is bounded: when it is full new sends
+# are dropped and counted. Send errors are printed and counted rather than
+# raised, since the caller has already moved on.
+#
+# Most cues are the same few messages over and over (/action/1007 1.0,
+# "Go Sequence 23 cue 1", ...). preload() encodes them once at startup;
+# after that send_message() of one of them is a dict lookup and a single
+# sendto() of the ready-made bytes, with no message builder involved.
+# preload_bundle() does the same for a fixed bundle such as Stop -> marker
+# -> Play. Anything not preloaded is built as before; stats() counts both.
+#
+#     reaper.preload([("/action/1007", 1.0), ("/action/1016", 1.0)])
+#
+# A game event often fires a burst of cues at once (a stage win is eight or
+# more packets to two hosts). Sends made through senders inside
+# `with osc_pool.burst():` are collected instead of queued, and when the
+# block ends they are split by destination and each part goes out, in
+# order, from that destination's own sender thread with one sendmmsg()
+# system call where the platform has it (osc_batch.py). A stalled REAPER
+# queue therefore never holds up GrandMA cues, and cues to one destination
+# still go out in the order they were sent. burst_stats() counts the parts
+# sent ("bursts") and the system calls this saved.
+#
+#     with osc_pool.burst():
+#         gma.send_message("/gma3/cmd", "Win Stage")
+#         reaper.send_bundle([...])
+#
+# burst(on_sent=callback) calls callback() on a sender thread once every
+# part of the burst has been handed to the network (not at all if it was
+# empty or a send failed); the latency trace uses it to time press -> cue out.
+
+
+class OscClient:
+    """A SimpleUDPClient plus per-destination counters."""
+
+    def __init__(self, ip, port):
+        self.ip = ip
+        self.port = port
+        self._client = udp_client.SimpleUDPClient(ip, port)
+        self._lock = threading.Lock()  # guards the counters, not the socket
+        self.sends = 0       # datagrams
+        self.messages = 0    # OSC messages, counting each one inside a bundle
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.cached = 0      # sends served from the pre-encoded cache
+        self._cache = {}     # message key -> built OscMessage/OscBundle
+
+    def preload(self, messages):
+        """Encode [(address, value), ...] now so sending them later skips the builder."""
+        for address, value in messages:
+            self._cache[_key(address, value)] = build_message(address, value)
+
+    def preload_bundle(self, messages):
+        """Encode one fixed immediate bundle, as sent by send_bundle(messages)."""
+        self._cache[tuple(_key(a, v) for a, v in messages)] = build_bundle(messages)
+
+    def _sent(self, seconds, ok=True, messages=1, cached=False):
+        with self._lock:
+            if ok:
+                self.cached += cached
+                self.sends += 1
+                self.messages += messages
+                self.total_s += seconds
+                if seconds > self.max_s:
+                    self.max_s = seconds
+            else:
+                self.errors += 1
+
+    def encode(self, address, value):
+        """(datagram bytes, came from the cache) for one message."""
+        msg = self._cache.get(_key(address, value))
+        if msg is None:
+            return build_message(address, value).dgram, False
+        return msg.dgram, True
+
+    def encode_bundle(self, messages, timetag=None):
+        if timetag is None:
+            bundle = self._cache.get(tuple(_key(a, v) for a, v in messages))
+            if bundle is not None:
+                return bundle.dgram, True
+        return build_bundle(messages, timetag).dgram, False
+
+    def send_message(self, address, value):
+        t = time.perf_counter()
+        msg = self._cache.get(_key(address, value))
+        try:
+            if msg is None:
+                self._client.send_message(address, value)
+            else:
+                self._client.send(msg)
+        except Exception:
+            self._sent(0.0, ok=False)
+            raise
+        self._sent(time.perf_counter() - t, cached=msg is not None)
+
+    def send(self, content, messages=1, cached=False):
+        """Send an already built OscMessage or OscBundle."""
+        t = time.perf_counter()
+        try:
+            self._client.send(content)
+        except Exception:
+            self._sent(0.0, ok=False)
+            raise
+        self._sent(time.perf_counter() - t, messages=messages, cached=cached)
+
+    def send_bundle(self, messages, timetag=None):
+        """
+        Send [(address, value), ...] as one bundle. `timetag` is a time.time()
+        value for the receiver to act on; None means "immediately".
+        """
+        if timetag is None:
+            bundle = self._cache.get(tuple(_key(a, v) for a, v in messages))
+            if bundle is not None:
+                return self.send(bundle, len(messages), cached=True)
+        self.send(build_bundle(messages, timetag), len(messages))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sends": self.sends,
+                "messages": self.messages,
+                "errors": self.errors,
+                "cached": self.cached,
+                "avg_ms": round(self.total_s / self.sends * 1000, 4) if self.sends else 0.0,
+                "max_ms": round(self.max_s * 1000, 4),
+            }
+
+
+def _key(address, value):
+    # The type is part of the key: 1 and 1.0 are equal but encode differently
+    if isinstance(value, (list, tuple)):
+        return (address, tuple((type(v), v) for v in value))
+    return (address, type(value), value)
+
+
+def build_message(address, value):
+    msg = osc_message_builder.OscMessageBuilder(address=address)
+    for arg in value if isinstance(value, (list, tuple)) else (value,):
+        msg.add_arg(arg)
+    return msg.build()
+
+
+def build_bundle(messages, timetag=None):
+    builder = osc_bundle_builder.OscBundleBuilder(
+        osc_bundle_builder.IMMEDIATELY if timetag is None else timetag)
+    for address, value in messages:
+        builder.add_content(build_message(address, value))
+    return builder.build()
+
+
+class OscSender:
+    """Bounded send queue for one destination, drained by its own thread."""
+
+    def __init__(self, client, maxsize=256):
+        self.client = client
+        self.maxsize = maxsize
+        self._queue = deque()        # append/popleft are thread-safe without a lock
+        self._wake = threading.Event()
+        self._busy = False
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        # Only the sender thread writes these
+        self.sent = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"osc-{client.ip}:{client.port}", daemon=True)
+        self._thread.start()
+
+    def _put(self, send, *args):
+        if len(self._queue) >= self.maxsize:
+            with self._drop_lock:
+                self.dropped += 1
+            return False
+        self._queue.append((time.perf_counter(), send, args))
+        self._wake.set()
+        return True
+
+    def send_message(self, address, value):
+        items = getattr(_local, "burst", None)
+        if items is not None:
+            items.append((self.client, *self.client.encode(address, value), 1))
+            return True
+        return self._put(self.client.send_message, address, value)
+
+    def send_bundle(self, messages, timetag=None):
+        items = getattr(_local, "burst", None)
+        if items is not None:
+            items.append((self.client, *self.client.encode_bundle(messages, timetag), len(messages)))
+            return True
+        return self._put(self.client.send_bundle, messages, timetag)
+
+    def _run(self):
+        queue = self._queue
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self._busy = True
+            self.max_depth = max(self.max_depth, len(queue))
+            while queue:
+                queued_at, send, args = queue.popleft()
+                try:
+                    send(*args)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"OSC send to {self.client.ip}:{self.client.port} failed: {e}")
+                wait = time.perf_counter() - queued_at
+                self.sent += 1
+                self.total_wait_s += wait
+                if wait > self.max_wait_s:
+                    self.max_wait_s = wait
+            self._busy = False
+
+    def flush(self, timeout=1.0):
+        """Wait (up to `timeout` s) for everything queued so far to go out."""
+        deadline = time.monotonic() + timeout
+        while (self._queue or self._busy) and time.monotonic() < deadline:
+            time.sleep(0.002)
+        return not (self._queue or self._busy)
+
+    def stats(self):
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.total_wait_s / self.sent * 1000, 4) if self.sent else 0.0,
+            "max_wait_ms": round(self.max_wait_s * 1000, 4),
+        }
+
+
+_clients = {}
+_senders = {}
+_lock = threading.Lock()
+_local = threading.local()  # .burst/.on_sent: what burst() is collecting on this thread
+_batch = None               # BatchSocket shared by every burst, created on first use
+_batch_lock = threading.Lock()
+_bursts = {"bursts": 0, "datagrams": 0, "syscalls": 0}
+
+
+def client(ip, port):
+    """The shared client for (ip, port), created on first use."""
+    key = (ip, int(port))
+    c = _clients.get(key)
+    if c is None:
+        with _lock:
+            c = _clients.get(key)
+            if c is None:
+                c = _clients[key] = OscClient(ip, int(port))
+    return c
+
+
+def sender(ip, port, maxsize=256):
+    """The shared queued sender for (ip, port), created on first use."""
+    key = (ip, int(port))
+    s = _senders.get(key)
+    if s is None:
+        c = client(ip, port)
+        with _lock:
+            s = _senders.get(key)
+            if s is None:
+                s = _senders[key] = OscSender(c, maxsize)
+    return s
+
+
+def send_message(ip, port, address, value):
+    client(ip, port).send_message(address, value)
+
+
+@contextmanager
+def burst(on_sent=None):
+    """Collect this thread's sender sends until the block ends, then send them in one go."""
+    if getattr(_local, "burst", None) is not None:  # nested: the outer block sends
+        if on_sent is not None:
+            _local.on_sent.append(on_sent)
+        yield
+        return
+    items = _local.burst = []
+    callbacks = _local.on_sent = [] if on_sent is None else [on_sent]
+    try:
+        yield
+    finally:
+        _local.burst = _local.on_sent = None
+        if items:
+            parts = {}
+            for item in items:
+                parts.setdefault((item[0].ip, item[0].port), []).append(item)
+            if len(parts) > 1 and callbacks:
+                callbacks = [_after_all(len(parts), callbacks)]
+            for dest, part in parts.items():
+                _senders[dest]._put(_send_burst, part, callbacks)
+
+
+def _after_all(n, callbacks):
+    """A callback that runs each of `callbacks` on its n-th call."""
+    left = [n]
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            left[0] -= 1
+            if left[0]:
+                return
+        for callback in callbacks:
+            callback()
+    return call
+
+
+def _send_burst(items, on_sent=()):
+    """
+    Runs on a sender thread: [(client, datagram, cached, messages), ...] in
+    one batch, then each of `on_sent`.
+    """
+    global _batch
+    t = time.perf_counter()
+    try:
+        with _batch_lock:
+            if _batch is None:
+                _batch = BatchSocket()
+            calls = _batch.send([(dgram, (c.ip, c.port)) for c, dgram, _, _ in items])
+    except Exception:
+        for c, _, _, _ in items:
+            c._sent(0.0, ok=False)
+        raise
+    each = (time.perf_counter() - t) / len(items)
+    for c, _, cached, messages in items:
+        c._sent(each, messages=messages, cached=cached)
+    with _lock:
+        _bursts["bursts"] += 1
+        _bursts["datagrams"] += len(items)
+        _bursts["syscalls"] += calls
+    for callback in on_sent:
+        callback()
+
+
+def burst_stats():
+    """Bursts sent, their datagrams, the system calls used and how many that saved."""
+    with _lock:
+        out = dict(_bursts)
+    out["saved"] = out["datagrams"] - out["syscalls"]
+    out["sendmmsg"] = _batch.batched if _batch is not None else BatchSocket.supported()
+    return out
+
+
+def flush(timeout=1.0):
+    """Wait for every sender's queue to empty (e.g. before exiting)."""
+    deadline = time.monotonic() + timeout
+    with _lock:
+        senders = list(_senders.values())
+    return all(s.flush(max(0.0, deadline - time.monotonic())) for s in senders)
+
+
+def stats():
+    """
+    Counters for every destination used so far, keyed "ip:port". Destinations
+    with a sender also get its queue counters under "queue".
+    """
+    with _lock:
+        clients = list(_clients.items())
+        senders = dict(_senders)
+    out = {}
+    for key, c in clients:
+        out[f"{c.ip}:{c.port}"] = c.stats()
+        if key in senders:
+            out[f"{c.ip}:{c.port}"]["queue"] = senders[key].stats()
+    return out
@@ -0,0 +1,145 @@
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+
+from percentiles import percentiles
+
+# -------- Timed cue sequences --------
+# Some cues have to go out a fixed time apart, e.g. the startup sequence:
+# "Go Sequence 102 cue 5", 0.2 s later "Go+ Sequence 102", 0.2 s later again.
+# Doing that with time.sleep() between sends freezes whatever thread does it,
+# and on the Tk thread that is the whole window.
+#
+# CueScheduler takes the sequence as a list of (offset, destination, message)
+# entries, returns straight away, and one background thread sends each entry
+# when its time comes. Offsets are seconds from the moment the sequence is
+# scheduled, measured on time.monotonic(). `destination` is anything with
+# send_message(address, value) (an osc_pool client or sender) and `message`
+# is (address, value), or a list of them to go out as one send_bundle().
+#
+#     cues = osc_schedule.CueScheduler()
+#     cues.schedule([
+#         (0.0, gma, ("/gma3/cmd", "Go Sequence 102 cue 5")),
+#         (0.2, gma, ("/gma3/cmd", "Go+ Sequence 102")),
+#         (0.4, gma, ("/gma3/cmd", "Go+ Sequence 102")),
+#     ], on_done=lambda: print("startup sent"))
+#
+# The consoles act on a packet when it arrives and ignore OSC bundle
+# timetags, so the timing is done here, before sending. The thread sleeps
+# until just before each deadline and spins the last fraction of a
+# millisecond. stats() reports how late each send actually was (jitter),
+# measured when send_message() returns. Give the scheduler osc_pool clients
+# (sender.client), which sendto() right there, so that is when the packet
+# left. With a queued sender it would only be when the cue was queued, and
+# the queue wait would be missing from the numbers.
+
+SPIN_S = 0.0005  # wake this early and spin to the deadline
+
+
+class CueScheduler:
+    def __init__(self, clock=time, samples=1024):
+        self.clock = clock
+        self._heap = []                  # (deadline, order, sequence id, destination, message)
+        self._order = itertools.count()
+        self._ids = itertools.count(1)
+        self._pending = {}               # sequence id -> [entries left, on_done]
+        self._cond = threading.Condition()
+        # Only the scheduler thread writes these
+        self.dispatched = 0
+        self.errors = 0
+        self.total_late_s = 0.0
+        self.max_late_s = 0.0
+        self._late = deque(maxlen=samples)
+        self._thread = threading.Thread(target=self._run, name="osc-schedule", daemon=True)
+        self._thread.start()
+
+    def schedule(self, entries, on_done=None):
+        """
+        Queue [(offset, destination, message), ...] and return its id
+        for cancel(). on_done() runs on the scheduler thread after the last send.
+        """
+        now = self.clock.monotonic()
+        with self._cond:
+            seq = next(self._ids)
+            self._pending[seq] = [len(entries), on_done]
+            for offset, dest, message in entries:
+                heapq.heappush(self._heap, (now + offset, next(self._order), seq, dest, message))
+            if not entries:
+                self._pending.pop(seq)
+            self._cond.notify()
+        if not entries and on_done:
+            on_done()
+        return seq
+
+    def cancel(self, seq):
+        """Drop whatever is left of a sequence; its on_done is not called."""
+        with self._cond:
+            self._pending.pop(seq, None)
+            self._heap = [e for e in self._heap if e[2] != seq]
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def _next(self):
+        """Block until the earliest entry is due, then pop and return it."""
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - self.clock.monotonic()
+                if wait <= SPIN_S:
+                    break
+                self._cond.wait(wait - SPIN_S)
+            entry = heapq.heappop(self._heap)
+        while self.clock.monotonic() < entry[0]:
+            pass
+        return entry
+
+    def _run(self):
+        while True:
+            deadline, _, seq, dest, message = self._next()
+            try:
+                if isinstance(message, list):
+                    dest.send_bundle(message)
+                else:
+                    dest.send_message(*message)
+            except Exception as e:
+                self.errors += 1
+                print(f"Scheduled OSC {message!r} failed: {e}")
+            late = self.clock.monotonic() - deadline
+            self.dispatched += 1
+            self.total_late_s += late
+            if late > self.max_late_s:
+                self.max_late_s = late
+            self._late.append(late)
+
+            done = None
+            with self._cond:
+                left = self._pending.get(seq)
+                if left is not None:
+                    left[0] -= 1
+                    if left[0] == 0:
+                        del self._pending[seq]
+                        done = left[1]
+            if done:
+                try:
+                    done()
+                except Exception as e:
+                    print(f"Cue sequence callback failed: {e}")
+
+    def idle(self):
+        with self._cond:
+            return not self._heap
+
+    def stats(self):
+        """How late sends were: from each deadline to its send_message() returning."""
+        return {
+            "dispatched": self.dispatched,
+            "errors": self.errors,
+            "pending": len(self._heap),
+            "avg_late_ms": round(self.total_late_s / self.dispatched * 1000, 4) if self.dispatched else 0.0,
+            "p99_late_ms": percentiles(list(self._late), (99,), scale=1000)["p99"],
+            "max_late_ms": round(self.max_late_s * 1000, 4),
+        }
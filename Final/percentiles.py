@@ -0,0 +1,28 @@
+# -------- Percentiles --------
+# Every report in this folder (LED frame times, OSC ingest and cue lateness,
+# load-test and press-trace latency) uses this one definition, so a p99 from
+# one tool can be compared with a p99 from another: the nearest rank,
+# ordered[round((n - 1) * pct / 100)]. The median of 1..4 is therefore 3, and
+# p100 is the maximum. Empty input gives 0.0.
+#
+#     percentile([3, 1, 2], 50)                  # -> 2
+#     percentiles(latency_ms, (50, 95, 99))      # -> {"p50": ..., "p95": ..., "p99": ...}
+
+
+def _rank(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def percentile(values, pct):
+    """The `pct` (0-100) percentile of `values`."""
+    if not values:
+        return 0.0
+    return _rank(sorted(values), pct)
+
+
+def percentiles(values, pcts=(50, 95, 99), scale=1.0, digits=4):
+    """{"p50": ..., ...} for each of `pcts`, sorting once; each value times `scale`, rounded."""
+    ordered = sorted(values)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in pcts}
+    return {f"p{p}": round(_rank(ordered, p) * scale, digits) for p in pcts}
@@ -0,0 +1,24 @@
+# -------- Virtual clock --------
+# A stand-in for the time module whose sleep() moves the clock forward
+# instead of waiting. Hand it to LedEngine or neopixel_sim's strip as `clock`
+# and a 5 s effect plays in as long as it takes to render. The benchmarks
+# and the tests both use it, so neither depends on the other.
+#
+#     clock = VirtualClock()
+#     engine = LedEngine(Adafruit_NeoPixel(300, 18, clock=clock), clock=clock)
+
+
+class VirtualClock:
+    """time-module lookalike whose sleep() just moves the clock forward."""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def monotonic(self):
+        return self.t
+
+    time = monotonic
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.t += seconds
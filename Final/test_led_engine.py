@@ -0,0 +1,218 @@
+"""
+LED engine tests: priorities, preemption, cancelling, on_done and what the
+strip is left showing after the game's layered win and fail sequences.
+
+Everything runs on the simulated strip (neopixel_sim.py) and a virtual clock,
+through run_until_idle(), so no test really waits and every run is the same.
+
+    cd Final && python3 -m pytest -q test_led_engine.py
+"""
+from neopixel_sim import Adafruit_NeoPixel, Color
+from sim_clock import VirtualClock
+from led_engine import LedEngine, PRIORITY_PROGRESS, PRIORITY_EFFECT, PRIORITY_ALERT
+from led_compositor import DEFAULT_LAYERS
+from led_progress import ProgressBar
+from led_effects import flash, flash_bpm, green_dim, red_dim
+
+LEDS = 30
+FPS = 60
+RED, BLUE = Color(255, 0, 0), Color(0, 0, 255)
+
+
+class Clock(VirtualClock):
+    """VirtualClock that can run callbacks at set times, like another thread would."""
+
+    def __init__(self):
+        super().__init__()
+        self._at = []
+
+    def at(self, t, func):
+        self._at.append((t, func))
+
+    def sleep(self, seconds):
+        super().sleep(seconds)
+        due = [e for e in self._at if e[0] <= self.t]
+        self._at = [e for e in self._at if e[0] > self.t]
+        for _, func in due:
+            func()
+
+
+def make_engine(layers=None):
+    clock = Clock()
+    strip = Adafruit_NeoPixel(LEDS, 18, clock=clock, record=True)
+    return LedEngine(strip, fps=FPS, clock=clock, layers=layers), strip, clock
+
+
+def solid(fb, color, frames, log=None, clock=None):
+    """Fill with `color` for `frames` frames, noting the time of each step in `log`."""
+    for _ in range(frames):
+        fb.fill(color)
+        if log is not None:
+            log.append(clock.t)
+        yield
+
+
+def shown(strip):
+    return strip.getPixels().copy()
+
+
+# -------- Priorities and preemption --------
+def test_higher_priority_preempts_the_running_effect():
+    engine, strip, clock = make_engine()
+    low_steps, done = [], []
+    low = engine.submit(solid(engine.fb, BLUE, 100, low_steps, clock), PRIORITY_PROGRESS,
+                        on_done=lambda: done.append("low"))
+    clock.at(0.1, lambda: engine.submit(solid(engine.fb, RED, 3), PRIORITY_ALERT,
+                                        on_done=lambda: done.append("high")))
+    engine.run_until_idle()
+
+    assert low.cancelled and low.done.is_set()
+    assert engine.preempted == 1
+    assert max(low_steps) < 0.1 + 1.0 / FPS   # no step after the frame it was cut off in
+    assert done == ["high"]                    # a preempted effect's on_done is not called
+    assert (shown(strip) == RED).all()
+
+
+def test_equal_priority_queues_in_order():
+    engine, strip, clock = make_engine()
+    order = []
+    for name, color in (("a", RED), ("b", BLUE)):
+        engine.submit(solid(engine.fb, color, 2), PRIORITY_EFFECT, on_done=lambda n=name: order.append(n))
+    engine.run_until_idle()
+
+    assert order == ["a", "b"]
+    assert engine.preempted == 0
+    assert (shown(strip) == BLUE).all()
+
+
+# -------- Cancelling --------
+def test_cancel_takes_effect_within_one_frame():
+    engine, strip, clock = make_engine()
+    steps, next_steps = [], []
+    job = engine.submit(solid(engine.fb, RED, 1000, steps, clock))
+    engine.submit(solid(engine.fb, BLUE, 1, next_steps, clock))
+    clock.at(0.25, job.cancel)
+    engine.run_until_idle()
+
+    period = 1.0 / FPS
+    assert job.done.is_set()
+    assert max(steps) < 0.25                   # the cancelled effect never ran again
+    assert 0.25 <= next_steps[0] <= 0.25 + period + 1e-9  # the next one started on the next frame
+    assert (shown(strip) == BLUE).all()
+
+
+def test_cancel_all_below_keeps_higher_priorities():
+    engine, strip, clock = make_engine()
+    low = engine.submit(solid(engine.fb, BLUE, 100), PRIORITY_PROGRESS)
+    high = engine.submit(solid(engine.fb, RED, 100), PRIORITY_ALERT)
+    engine.cancel_all(below=PRIORITY_ALERT)
+    engine.run_until_idle()
+
+    assert low.cancelled and not high.cancelled
+    assert (shown(strip) == RED).all()
+
+
+# -------- on_done --------
+def test_on_done_runs_only_when_the_effect_finishes():
+    engine, strip, clock = make_engine()
+    done = []
+    finished = engine.submit(solid(engine.fb, RED, 3), on_done=lambda: done.append("finished"))
+    cancelled = engine.submit(solid(engine.fb, BLUE, 100), on_done=lambda: done.append("cancelled"))
+    clock.at(0.2, cancelled.cancel)
+    engine.run_until_idle()
+
+    assert finished.done.is_set() and cancelled.done.is_set()
+    assert done == ["finished"]
+
+
+def test_cancelled_before_starting_never_draws():
+    engine, strip, clock = make_engine()
+    done, steps = [], []
+    engine.submit(solid(engine.fb, RED, 3))
+    queued = engine.submit(solid(engine.fb, BLUE, 3, steps, clock), on_done=lambda: done.append("queued"))
+    queued.cancel()
+    engine.run_until_idle()
+
+    assert queued.done.is_set()
+    assert steps == [] and done == []
+    assert (shown(strip) == RED).all()
+
+
+# -------- after_show --------
+def test_after_show_is_dropped_when_the_frame_changes_nothing():
+    engine, strip, clock = make_engine()
+    engine.submit(solid(engine.fb, RED, 3))
+    engine.run_until_idle()
+    seen = []
+    engine.submit(solid(engine.fb, RED, 3))     # the same picture again
+    engine.after_show(lambda: seen.append("same"))
+    engine.run_until_idle()
+    engine.submit(solid(engine.fb, BLUE, 1))
+    engine.run_until_idle()
+
+    assert seen == []                          # not handed the later blue frame
+    assert engine.stats()["unseen"] == 1
+
+
+# -------- Layered game sequences --------
+def grown_bar(engine, n):
+    bar = ProgressBar(engine)
+    bar.advance(n, BLUE)
+    engine.run_until_idle()
+    return bar
+
+
+def test_stage_win_leaves_the_strip_dark():
+    engine, strip, clock = make_engine(DEFAULT_LAYERS)
+    bar = grown_bar(engine, LEDS)
+    assert (shown(strip) == BLUE).all()
+    start = len(strip.frames)
+
+    # as print_args() does when the goal is reached
+    bar.reset()
+    overlay = engine.layer("overlay")
+    engine.submit(flash_bpm(overlay, LEDS))
+    engine.submit(green_dim(overlay, LEDS))
+    engine.run_until_idle()
+
+    frames = [pixels for _, pixels in strip.frames[start:]]
+    assert not any((pixels == BLUE).any() for pixels in frames)   # the bar never shows through
+    assert sum(1 for pixels in frames if not pixels.any()) >= 5     # the pulse's off beats are fully dark
+    assert not shown(strip).any()
+
+
+def test_stage_fail_leaves_the_strip_dark():
+    engine, strip, clock = make_engine(DEFAULT_LAYERS)
+    bar = grown_bar(engine, LEDS * 2 // 3)
+    start = len(strip.frames)
+
+    # as check_timer() does when the time runs out
+    bar.reset()
+    engine.submit(red_dim(engine.layer("overlay"), LEDS))
+    engine.run_until_idle()
+
+    frames = [pixels for _, pixels in strip.frames[start:]]
+    assert not any((pixels == BLUE).any() for pixels in frames)
+    assert sum(1 for pixels in frames if not pixels.any()) >= 5     # each of the five blinks goes dark
+    assert not shown(strip).any()
+
+
+def test_game_over_leaves_the_strip_dark():
+    engine, strip, clock = make_engine(DEFAULT_LAYERS)
+    bar = grown_bar(engine, LEDS // 2)
+
+    # the third failed try: the fail animation, then the red flash on "alert"
+    flashed = []
+
+    def game_over_flash():
+        flashed.append(clock.t)
+        engine.submit(flash(engine.layer("alert"), LEDS, RED, 2), PRIORITY_ALERT, layer="alert")
+
+    bar.reset()
+    blinks = engine.submit(red_dim(engine.layer("overlay"), LEDS), on_done=game_over_flash)
+    engine.run_until_idle()
+
+    assert blinks.done.is_set() and len(flashed) == 1
+    assert any((pixels == RED).all() for t, pixels in strip.frames if t >= flashed[0])
+    assert not engine.layer("progress").pixels.any()
+    assert not shown(strip).any()
@@ -3,6 +3,11 @@ import threading
 import tkinter as tk
 from rpi_ws281x import *
 from pythonosc import udp_client, dispatcher, osc_server
+import osc_schedule  # from Final/: run with PYTHONPATH=Final (see README)
+from led_buffer import FrameBuffer, StripWriter
+from led_effects import STEP, chase
+from led_cache import play
+from led_shows import LEVEL_START_SHOWS_MVP, compile_show
 
 # OSC addresses
 GMA_IP, GMA_PORT       = "192.168.254.213", 2000
@@ -11,6 +16,7 @@ LOCAL_IP, LOCAL_PORT   = "192.168.254.108", 8006
 
 gma_client    = udp_client.SimpleUDPClient(GMA_IP, GMA_PORT)
 reaper_client = udp_client.SimpleUDPClient(REAPER_IP, REAPER_PORT)
+cues          = osc_schedule.CueScheduler()  # timed cue sequences, off the Tk thread
 
 # NeoPixel setup
 LED_COUNT = 300
@@ -22,25 +28,33 @@ def light_up(n, color):
         strip.setPixelColor(i, color)
     strip.show()
 
+def run_effect(effect, *args):
+    # Plays one of Final/led_effects.py's effects (e.g. its chase()) straight
+    # onto the strip, blocking like the rest of this file: one show() per
+    # frame the effect yields, only for the pixels it changed.
+    fb = FrameBuffer(LED_COUNT)
+    writer = StripWriter(strip)
+
+    def show():
+        span = fb.take_dirty()
+        if span is not None:
+            writer.write(fb.pixels, *span)
+            strip.show()
+
+    for hold in effect(fb, *args):
+        show()
+        time.sleep(STEP if hold is None else hold)
+    show()
+
 def red_dim_down(n):
-    for i in range(n-1, -1, -1):
-        strip.setPixelColor(i, Color(255, 0, 0))
-        strip.show()
-        time.sleep(0.005)
-        strip.setPixelColor(i, 0)
-        strip.show()
+    run_effect(chase, n, Color(255, 0, 0))  # one red pixel from the far end down to 0 in 1.5 s
     for _ in range(5):
         light_up(n, Color(255, 0, 0)); time.sleep(0.3)
         light_up(n, 0); time.sleep(0.3)
     light_up(LED_COUNT, 0)
 
 def green_dim_down(n):
-    for i in range(n-1, -1, -1):
-        strip.setPixelColor(i, Color(0, 255, 0))
-        strip.show()
-        time.sleep(0.005)
-        strip.setPixelColor(i, 0)
-        strip.show()
+    run_effect(chase, n, Color(0, 255, 0))
 
 def flash_bpm(n, bpm=120, duration=5):
     delay = 60 / bpm / 2
@@ -57,33 +71,12 @@ def get_stage_color(level):
     }.get(level, Color(255, 255, 255))
 
 def level_start_sequence(level):
-    if level == 1:
-        trigger_reaper_with_level_delay(addr6, 1)  # Level 1 start with 30s delay
-        for _ in range(6):
-            light_up(LED_COUNT, Color(0, 0, 255)); time.sleep(0.25)
-            light_up(LED_COUNT, 0); time.sleep(0.25)
-        light_up(LED_COUNT, Color(0, 255, 0)); time.sleep(2)
-        light_up(LED_COUNT, 0)
-    elif level == 2:
-        trigger_reaper_with_level_delay(addr6, 2)  # Level 2 start with 40s delay
-        for _ in range(5):
-            light_up(LED_COUNT, Color(255, 140, 0)); time.sleep(0.1)
-            light_up(LED_COUNT, 0); time.sleep(0.1)
-        light_up(LED_COUNT, Color(0, 255, 0)); time.sleep(2)
-        light_up(LED_COUNT, 0)
-    elif level == 3:
-        trigger_reaper_with_level_delay(addr7, 3)  # Level 3 start with 50s delay
-        for _ in range(3):
-            light_up(LED_COUNT, Color(255, 255, 0)); time.sleep(0.3)
-            light_up(LED_COUNT, 0); time.sleep(0.3)
-        light_up(LED_COUNT, Color(0, 255, 0)); time.sleep(2)
-        light_up(LED_COUNT, 0)
-    elif level == 4:
-        trigger_reaper_with_level_delay(addr8, 4)  # Level 3 start with 60s delay
-        for i in range(6):
-            strip.setPixelColor(i * 50, Color(0, 255, 0)); strip.show(); time.sleep(0.1)
-        light_up(LED_COUNT, Color(0, 255, 0)); time.sleep(2)
-        light_up(LED_COUNT, 0)
+    # The flashes for each level are LEVEL_START_SHOWS_MVP in Final/led_shows.py
+    sfx = {1: addr6, 2: addr6, 3: addr7, 4: addr8}.get(level)
+    if sfx is None:
+        return
+    trigger_reaper_with_level_delay(sfx, level)  # level start audio, stopped after the level's time
+    run_effect(play, compile_show(LEVEL_START_SHOWS_MVP[level], LED_COUNT, round(1 / STEP)))
 
 def shutdown_sequences(level):
     cues = ["23 cue 1", "23 cue 2", "23 cue 3", "23 cue 4"]
@@ -185,16 +178,17 @@ class GameUI:
     def show_game_result(self, result): color = {"Win": "green", "Lose": "red", "Startup": "orange", "Ready": "blue", "Waiting": "gray"}.get(result, "gray"); self.root.after(0, lambda: self.game_result.config(text=f"Game: {result}", fg=color))
 
     def trigger_startup_sequence(self, event=None):
-        global startup_complete
         self.show_game_result("Startup")
-        gma_client.send_message("/gma3/cmd", "Go Sequence 38 cue 3")
-        time.sleep(0.3)
-        gma_client.send_message("/gma3/cmd", "Go+ Sequence 41")
-        time.sleep(0.9)
-        gma_client.send_message("/gma3/cmd", "On Sequence 207")
-        trigger_reaper(addr13)  # Jump to Marker 34
-        time.sleep(0.1)         # Small delay to ensure marker jump completes
-        trigger_reaper(addr15)  # Start playing
+        cues.schedule([
+            (0.0, gma_client,    ("/gma3/cmd", "Go Sequence 38 cue 3")),
+            (0.3, gma_client,    ("/gma3/cmd", "Go+ Sequence 41")),
+            (1.2, gma_client,    ("/gma3/cmd", "On Sequence 207")),
+            (1.2, reaper_client, (addr13, 1.0)),  # Jump to Marker 34
+            (1.3, reaper_client, (addr15, 1.0)),  # Start playing (after the marker jump)
+        ], on_done=self.startup_done)
+
+    def startup_done(self):
+        global startup_complete
         startup_complete = True
         self.show_game_result("Ready")
 